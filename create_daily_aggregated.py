@@ -1,13 +1,36 @@
 #!/usr/bin/env python3
 """
-Create daily aggregated table from intraday data
+Create daily aggregated tables from intraday data
 Only uses regular market hours: 9:30 AM - 4:00 PM ET
+
+Tables:
+  daily_aggregated - daily OHLC, volume, liquidity and flow metrics
+  daily_spread     - daily max spread and mid price (read by generate_split_indicators.py)
 """
+import os
 import duckdb
 import pandas as pd
 
+# DuckDB resources for the aggregation (GROUP BY over every 1-min bar)
+DUCKDB_THREADS = os.cpu_count() or 4
+DUCKDB_MEMORY_LIMIT = '16GB'
+
 # Connect to database (read-write mode)
 con = duckdb.connect('/Users/george/Documents/GitHub/orderFlow_datamanager/taq_database.duckdb')
+con.execute(f"PRAGMA threads={DUCKDB_THREADS}")
+con.execute(f"PRAGMA memory_limit='{DUCKDB_MEMORY_LIMIT}'")
+
+# The market-hours filters below compare against TIME literals; make sure
+# TimeBarStart is stored as TIME (not VARCHAR) so they are typed comparisons
+# that row-group min/max statistics can prune on
+time_type = con.execute("""
+    SELECT data_type FROM duckdb_columns()
+    WHERE table_name = 'taq_1min' AND column_name = 'TimeBarStart'
+      AND database_name = current_database() AND schema_name = current_schema()
+""").fetchone()[0]
+if time_type != 'TIME':
+    print(f"Converting taq_1min.TimeBarStart from {time_type} to TIME...")
+    con.execute("ALTER TABLE taq_1min ALTER TimeBarStart SET DATA TYPE TIME USING CAST(TimeBarStart AS TIME)")
 
 print("Creating daily_aggregated table from regular market hours (9:30 AM - 4:00 PM)...")
 
@@ -21,23 +44,14 @@ SELECT
     Ticker,
     Date,
     
-    -- OHLC (First/Last bars of the day)
-    (SELECT OpenBidPrice FROM taq_1min t2 
-     WHERE t2.Ticker = t1.Ticker AND t2.Date = t1.Date 
-     AND t2.TimeBarStart >= '09:30:00' AND t2.TimeBarStart < '16:00:00'
-     ORDER BY TimeBarStart LIMIT 1) as open,
+    -- OHLC (First/Last bars of the day, resolved in the same GROUP BY pass)
+    arg_min(OpenBidPrice, TimeBarStart) as open,
     MAX(HighTradePrice) as high,
     MIN(LowTradePrice) as low,
-    (SELECT CloseAskPrice FROM taq_1min t2 
-     WHERE t2.Ticker = t1.Ticker AND t2.Date = t1.Date 
-     AND t2.TimeBarStart >= '09:30:00' AND t2.TimeBarStart < '16:00:00'
-     ORDER BY TimeBarStart DESC LIMIT 1) as close,
+    arg_max(CloseAskPrice, TimeBarStart) as close,
     
     -- Last trade price for compatibility
-    (SELECT LastTradePrice FROM taq_1min t2 
-     WHERE t2.Ticker = t1.Ticker AND t2.Date = t1.Date 
-     AND t2.TimeBarStart >= '09:30:00' AND t2.TimeBarStart < '16:00:00'
-     ORDER BY TimeBarStart DESC LIMIT 1) as last_price,
+    arg_max(LastTradePrice, TimeBarStart) as last_price,
     
     -- Volume & Trades
     SUM(Volume) as total_volume,
@@ -79,8 +93,8 @@ SELECT
     COUNT(*) as bar_count
     
 FROM taq_1min t1
-WHERE TimeBarStart >= '09:30:00' 
-  AND TimeBarStart < '16:00:00'
+WHERE TimeBarStart >= TIME '09:30:00' 
+  AND TimeBarStart < TIME '16:00:00'
 GROUP BY Ticker, Date
 ORDER BY Ticker, Date
 """
@@ -91,6 +105,25 @@ con.execute(query)
 count = con.execute("SELECT COUNT(*) FROM daily_aggregated").fetchone()[0]
 print(f"\n✅ Created daily_aggregated table with {count:,} rows")
 
+# Daily spread inputs for the TradingView indicators, so the generator
+# reads one small row per (Ticker, Date) instead of re-aggregating 1-min bars
+print("\nCreating daily_spread table...")
+con.execute("""
+CREATE OR REPLACE TABLE daily_spread AS
+SELECT 
+    Ticker,
+    Date,
+    MAX(MaxSpread) as max_spread,
+    AVG((CloseBidPrice + CloseAskPrice) / 2) as mid_price
+FROM taq_1min
+WHERE TimeBarStart >= TIME '09:30:00' 
+  AND TimeBarStart < TIME '16:00:00'
+GROUP BY Ticker, Date
+ORDER BY Ticker, Date
+""")
+spread_count = con.execute("SELECT COUNT(*) FROM daily_spread").fetchone()[0]
+print(f"✅ Created daily_spread table with {spread_count:,} rows")
+
 print("\nSample data (first 5 rows):")
 sample = con.execute("""
     SELECT Ticker, Date, open, high, low, close, total_volume, 
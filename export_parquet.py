@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Export taq_1min to a Parquet dataset partitioned by Ticker
+
+Writes <PARQUET_DATA_DIR>/Ticker=<symbol>/*.parquet, sorted by Date and
+TimeBarStart within each ticker. Point the web app at the dataset with
+PARQUET_DATA_DIR: a single-ticker query then only opens that ticker's
+directory (hive partition pruning) and its row groups carry min/max stats.
+
+Source: MotherDuck when MOTHERDUCK_TOKEN is set, otherwise the local
+database at LOCAL_DATABASE_PATH.
+"""
+import os
+import duckdb
+
+# Rows per Parquet row group (about a trading day of 1-min bars for a few dozen tickers)
+ROW_GROUP_SIZE = 10000
+
+def export_parquet():
+    output_dir = os.environ.get('PARQUET_DATA_DIR', 'taq_parts')
+    
+    if os.environ.get('MOTHERDUCK_TOKEN'):
+        database_name = os.environ.get('DATABASE_NAME', 'marketflow')
+        print(f"🦆 Connecting to MotherDuck database: {database_name}")
+        con = duckdb.connect(f'md:{database_name}')
+    else:
+        db_path = os.environ.get('LOCAL_DATABASE_PATH', '/Users/george/Documents/GitHub/orderFlow_datamanager/taq_database.duckdb')
+        print(f"📁 Using local database: {db_path}")
+        con = duckdb.connect(db_path, read_only=True)
+    
+    print(f"\n📦 Exporting taq_1min to {output_dir}/Ticker=*/ ...")
+    output_path = output_dir.replace("'", "''")
+    con.execute(f"""
+        COPY (SELECT * FROM taq_1min ORDER BY Ticker, Date, TimeBarStart)
+        TO '{output_path}'
+        (FORMAT PARQUET, PARTITION_BY (Ticker), OVERWRITE_OR_IGNORE, ROW_GROUP_SIZE {ROW_GROUP_SIZE})
+    """)
+    
+    ticker_count, row_count = con.execute("SELECT COUNT(DISTINCT Ticker), COUNT(*) FROM taq_1min").fetchone()
+    print(f"  ✅ {row_count:,} rows written for {ticker_count} tickers")
+    
+    con.close()
+    print(f"\n✅ Export complete! Set PARQUET_DATA_DIR={output_dir} to serve from it")
+
+if __name__ == "__main__":
+    export_parquet()
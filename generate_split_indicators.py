@@ -1,13 +1,21 @@
 #!/usr/bin/env python3
 """
 Generate two TradingView indicators with split ticker groups and full date range
+
+Reads the daily_spread table, so run create_daily_aggregated.py first
+after ingesting new data.
 """
 import duckdb
+import numpy as np
 import os
 
 # Database path
 DB_PATH = '/Users/george/Documents/GitHub/orderFlow_datamanager/taq_database.duckdb'
 
+# DuckDB resources for the spread queries
+DUCKDB_THREADS = os.cpu_count() or 4
+DUCKDB_MEMORY_LIMIT = '16GB'
+
 # Split tickers into two groups
 TICKERS_GROUP1 = ['ABBV', 'ABT', 'ALB', 'AMD', 'BABA', 'BIDU', 'CL', 'CMCSA', 'CRM', 'CRWD',
                   'DELL', 'DG', 'DHR', 'EOG', 'F', 'FCX', 'FSLR', 'GD', 'GDDY', 'GEV',
@@ -17,46 +25,77 @@ TICKERS_GROUP2 = ['HSY', 'INTC', 'IP', 'JD', 'JNJ', 'KEY', 'KHC', 'LEN', 'LIN',
                   'MAR', 'MARA', 'MDT', 'MMM', 'MOS', 'MRVL', 'MSFT', 'NEM', 'ORCL', 'PATH',
                   'PCG', 'PFE', 'PG', 'PLTR', 'PPLT', 'RCL']
 
+# Trading dates, shared by both groups once loaded
+_trading_dates = None
+
+def get_trading_dates(con):
+    """Fetch all trading dates from the daily_spread table (cached after the first call)"""
+    global _trading_dates
+    if _trading_dates is None:
+        dates_query = "SELECT DISTINCT Date FROM daily_spread ORDER BY Date"
+        _trading_dates = con.execute(dates_query).df()['Date'].tolist()
+    return _trading_dates
+
+# Daily spread per ticker, converted to basis points * 100 in SQL
+# (NULL when there is no valid mid price)
+SPREAD_QUERY = """
+SELECT 
+    Ticker,
+    Date,
+    CASE WHEN mid_price > 0 THEN ROUND(max_spread / mid_price * 10000, 2) END as spread_pct
+FROM daily_spread
+WHERE Ticker = ANY(?)
+"""
+
 def get_spread_data(con, tickers):
-    """Fetch spread data for given tickers"""
+    """Fetch spread data for given tickers
+    
+    Returns the trading dates and, per ticker, an int32 array of spread
+    values in hundredths aligned to those dates.
+    """
     # Get all dates
-    dates_query = "SELECT DISTINCT Date FROM taq_1min ORDER BY Date"
-    dates = [row[0] for row in con.execute(dates_query).fetchall()]
+    dates = get_trading_dates(con)
     
-    # Get spread data for each ticker
-    ticker_data = {}
-    for ticker in tickers:
-        query = """
-        SELECT 
-            Date,
-            MAX(MaxSpread) as max_spread,
-            AVG((CloseBidPrice + CloseAskPrice) / 2) as mid_price
-        FROM taq_1min
-        WHERE Ticker = ?
-        GROUP BY Date
-        ORDER BY Date
-        """
-        results = con.execute(query, [ticker]).fetchall()
-        
-        # Create spread percentage array
-        spread_dict = {}
-        for date, max_spread, mid_price in results:
-            if mid_price and mid_price > 0:
-                spread_pct = (max_spread / mid_price) * 10000  # basis points * 100
-                spread_dict[date] = round(spread_pct, 2)
-        
-        # Build array in date order
-        spread_array = []
-        for date in dates:
-            if date in spread_dict:
-                spread_array.append(spread_dict[date])
-            else:
-                spread_array.append(0.0)  # No data for this date
-        
-        ticker_data[ticker] = spread_array
+    # Get precomputed daily spread data for all tickers (the ticker list is
+    # bound as a single parameter, so the SQL text never changes)
+    df = con.execute(SPREAD_QUERY, [tickers]).df()
+    
+    # Scatter rows into a preallocated date x ticker matrix by index
+    # (no data or no valid mid price -> 0.0). Dates are sorted YYYYMMDD
+    # integer keys, so their positions come from one searchsorted call
+    all_dates = np.asarray(dates, dtype=np.int64)
+    row_dates = df['Date'].to_numpy(dtype=np.int64)
+    rows = np.searchsorted(all_dates, row_dates)
+    ticker_idx = {ticker: j for j, ticker in enumerate(tickers)}
+    cols = df['Ticker'].map(ticker_idx).to_numpy()
+    
+    spread_pct = np.zeros((len(dates), len(tickers)))
+    spread_pct[rows, cols] = df['spread_pct'].fillna(0.0).to_numpy(dtype=np.float64)
+    
+    # Store as exact int32 hundredths, one contiguous row per ticker
+    # (int16 is too narrow: wide spreads exceed 327.67)
+    spread_hundredths = np.ascontiguousarray(np.rint(spread_pct * 100).astype(np.int32).T)
+    ticker_data = {ticker: spread_hundredths[i] for i, ticker in enumerate(tickers)}
     
     return dates, ticker_data
 
+def format_spread_data(values):
+    """Format one ticker's spread hundredths as a Pine array expression
+    
+    Days without data are stored as 0, so tickers with few populated days are
+    emitted as (date index, value) pairs expanded in Pine, which is much
+    shorter than a dense literal. Mostly populated tickers keep the dense form.
+    """
+    nz = np.flatnonzero(values)
+    if len(nz) == 0:
+        return 'array.new<float>(array.size(dates), 0.0)'
+    
+    dense = f"array.from({', '.join(str(v / 100) for v in values.tolist())})"
+    idx_str = ', '.join(map(str, nz.tolist()))
+    val_str = ', '.join(str(v / 100) for v in values[nz].tolist())
+    sparse = f"expandSpreadData(array.from({idx_str}), array.from({val_str}))"
+    return sparse if len(sparse) < len(dense) else dense
+
 def generate_pine_script(group_num, tickers, dates, ticker_data, output_file):
     """Generate Pine Script indicator"""
     
@@ -64,7 +103,9 @@ def generate_pine_script(group_num, tickers, dates, ticker_data, output_file):
     tickers_per_func = 10
     ticker_chunks = [tickers[i:i + tickers_per_func] for i in range(0, len(tickers), tickers_per_func)]
     
-    script = f'''// This source code is subject to the terms of the Mozilla Public License 2.0 at https://mozilla.org/MPL/2.0/
+    # Stream the script straight to disk through a large write buffer
+    with open(output_file, 'w', buffering=1 << 20) as f:
+        f.write(f'''// This source code is subject to the terms of the Mozilla Public License 2.0 at https://mozilla.org/MPL/2.0/
 // © Generated from TAQ Database - Group {group_num}
 
 //@version=5
@@ -97,36 +138,42 @@ var int[] dates = array.from({', '.join(map(str, dates))})
 // MAX SPREAD DATA BY TICKER (stored as basis points * 100 for precision)
 // ============================================================================
 
-'''
-    
-    # Generate getSpreadData functions for each chunk
-    for chunk_idx, chunk in enumerate(ticker_chunks):
-        script += f'getSpreadData_{chunk_idx}(string ticker) =>\n'
-        script += '    switch ticker\n'
+// Expand sparse (date index, value) pairs into a full per-date array
+expandSpreadData(int[] idx, float[] vals) =>
+    data = array.new<float>(array.size(dates), 0.0)
+    for i = 0 to array.size(idx) - 1
+        array.set(data, array.get(idx, i), array.get(vals, i))
+    data
+
+''')
         
-        for ticker in chunk:
-            data_str = ', '.join(map(str, ticker_data[ticker]))
-            script += f'        "{ticker}" => array.from({data_str})\n'
+        # Generate getSpreadData functions for each chunk
+        for chunk_idx, chunk in enumerate(ticker_chunks):
+            f.write(f'getSpreadData_{chunk_idx}(string ticker) =>\n')
+            f.write('    switch ticker\n')
+            
+            for ticker in chunk:
+                f.write(f'        "{ticker}" => {format_spread_data(ticker_data[ticker])}\n')
+            
+            f.write('        => array.new<float>(0)\n\n')
         
-        script += '        => array.new<float>(0)\n\n'
-    
-    # Generate main getSpreadData function
-    script += '// Main function to get spread data for any ticker\n'
-    script += 'getSpreadData(string ticker) =>\n'
-    
-    for chunk_idx, chunk in enumerate(ticker_chunks):
-        ticker_list = ', '.join([f'"{t}"' for t in chunk])
-        if chunk_idx == 0:
-            script += f'    if array.includes(array.from({ticker_list}), ticker)\n'
-        else:
-            script += f'    else if array.includes(array.from({ticker_list}), ticker)\n'
-        script += f'        getSpreadData_{chunk_idx}(ticker)\n'
-    
-    script += '    else\n'
-    script += '        array.new<float>(0)\n\n'
-    
-    # Add main logic and plotting
-    script += '''// ============================================================================
+        # Generate main getSpreadData function
+        f.write('// Main function to get spread data for any ticker\n')
+        f.write('getSpreadData(string ticker) =>\n')
+        
+        for chunk_idx, chunk in enumerate(ticker_chunks):
+            ticker_list = ', '.join([f'"{t}"' for t in chunk])
+            if chunk_idx == 0:
+                f.write(f'    if array.includes(array.from({ticker_list}), ticker)\n')
+            else:
+                f.write(f'    else if array.includes(array.from({ticker_list}), ticker)\n')
+            f.write(f'        getSpreadData_{chunk_idx}(ticker)\n')
+        
+        f.write('    else\n')
+        f.write('        array.new<float>(0)\n\n')
+        
+        # Add main logic and plotting
+        f.write('''// ============================================================================
 // MAIN LOGIC
 // ============================================================================
 currentTicker = str.replace_all(syminfo.ticker, "NASDAQ:", "")
@@ -175,11 +222,7 @@ if barstate.islast
     table.cell(infoTable, 1, 3, na(avgSpread) ? "N/A" : str.tostring(avgSpread, "#.####") + "%", text_color=na(avgSpread) ? color.gray : color.orange, text_size=size.small)
 
 alertcondition(spreadValue > 1.0, "High Max Spread Alert", "Max Spread is above 1.0%")
-'''
-    
-    # Write to file
-    with open(output_file, 'w') as f:
-        f.write(script)
+''')
     
     print(f"✓ Generated {output_file}")
     print(f"  - {len(tickers)} tickers")
@@ -189,23 +232,29 @@ alertcondition(spreadValue > 1.0, "High Max Spread Alert", "Max Spread is above
 def main():
     # Connect to database
     con = duckdb.connect(DB_PATH, read_only=True)
+    con.execute(f"PRAGMA threads={DUCKDB_THREADS}")
+    con.execute(f"PRAGMA memory_limit='{DUCKDB_MEMORY_LIMIT}'")
+    
+    # One scan for both groups, split per group afterwards
+    print("Fetching spread data for all tickers...")
+    dates, all_data = get_spread_data(con, TICKERS_GROUP1 + TICKERS_GROUP2)
+    ticker_data1 = {t: all_data[t] for t in TICKERS_GROUP1}
+    ticker_data2 = {t: all_data[t] for t in TICKERS_GROUP2}
     
-    print("Generating Group 1 indicator...")
-    dates1, ticker_data1 = get_spread_data(con, TICKERS_GROUP1)
+    print("\nGenerating Group 1 indicator...")
     generate_pine_script(
         1, 
         TICKERS_GROUP1, 
-        dates1, 
+        dates, 
         ticker_data1,
         '/Users/george/Documents/GitHub/scannersWebApp/tradingview_indicators/daily_spread_group1.pine'
     )
     
     print("\nGenerating Group 2 indicator...")
-    dates2, ticker_data2 = get_spread_data(con, TICKERS_GROUP2)
     generate_pine_script(
         2, 
         TICKERS_GROUP2, 
-        dates2, 
+        dates, 
         ticker_data2,
         '/Users/george/Documents/GitHub/scannersWebApp/tradingview_indicators/daily_spread_group2.pine'
     )
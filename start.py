@@ -18,6 +18,11 @@ def main():
     # Get port from environment (Render sets this automatically)
     port = int(os.getenv("PORT", 8000))
     
+    # Worker processes: one unless WEB_CONCURRENCY is set. Each worker opens its
+    # own DuckDB connection and keeps its own preloaded bars and response caches,
+    # so several of them do not fit in the 512 MB of Render's free plan
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    
     # Change to tradingview_app directory for app.py and static/
     script_dir = Path(__file__).parent.resolve()
     app_dir = script_dir / "tradingview_app"
@@ -28,26 +33,29 @@ def main():
         sys.path.insert(0, str(app_dir))
         print(f"📁 Changed working directory to: {app_dir}")
     
-    print(f"🚀 Starting Market Analysis Platform on port {port}")
+    print(f"🚀 Starting Market Analysis Platform on port {port} with {workers} worker(s)")
     print(f"📊 Current directory: {os.getcwd()}")
     print(f"📊 Python path: {sys.path[:3]}")
     print(f"🦆 USE_MOTHERDUCK: {os.getenv('USE_MOTHERDUCK', 'false')}")
     print(f"🦆 DATABASE_NAME: {os.getenv('DATABASE_NAME', 'not set')}")
     
-    # Import the app directly
+    # Import the app once up front so startup errors surface here
     try:
-        import app as application
+        import app  # noqa: F401
         print("✅ App module imported successfully")
     except Exception as e:
         print(f"❌ Failed to import app: {e}")
         sys.exit(1)
     
-    # Start the server
+    # Start the server (multiple workers need an import string; uvloop and
+    # httptools come with uvicorn[standard])
     uvicorn.run(
-        application.app,
+        "app:app",
         host="0.0.0.0",
         port=port,
-        workers=1,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
 
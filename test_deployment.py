@@ -6,10 +6,9 @@ Run this locally to ensure everything works before deploying to Render
 
 import os
 import sys
-import requests
-import time
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from fastapi.testclient import TestClient
 
 def test_database_connection():
     """Test if database is accessible"""
@@ -36,7 +35,8 @@ def test_database_connection():
 def test_imports():
     """Test if all required packages can be imported"""
     required_packages = [
-        "fastapi", "uvicorn", "duckdb", "pandas", "jinja2"
+        "fastapi", "uvicorn", "duckdb", "jinja2",
+        "orjson", "cachetools", "pyarrow", "numba"
     ]
     
     success = True
@@ -50,32 +50,24 @@ def test_imports():
     
     return success
 
-def start_test_server():
-    """Start server for testing"""
+def create_test_client():
+    """Load the app in-process and wrap it in an ASGI test client"""
     try:
         # Change to the correct directory
         if os.path.exists("tradingview_app"):
             os.chdir("tradingview_app")
+        sys.path.insert(0, os.getcwd())
         
-        print("🚀 Starting test server...")
-        process = subprocess.Popen(
-            [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", "8001"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        
-        # Wait for server to start
-        time.sleep(3)
-        
-        return process
+        print("🚀 Loading app in-process...")
+        import app as application
+        return TestClient(application.app)
         
     except Exception as e:
-        print(f"❌ Failed to start server: {e}")
+        print(f"❌ Failed to load app: {e}")
         return None
 
-def test_endpoints():
+def test_endpoints(client):
     """Test API endpoints"""
-    base_url = "http://127.0.0.1:8001"
     endpoints = [
         "/test",
         "/api/history?symbol=AAPL",
@@ -83,17 +75,25 @@ def test_endpoints():
         "/api/indicators?symbol=AAPL"
     ]
     
-    success = True
-    for endpoint in endpoints:
+    def check(endpoint):
         try:
-            response = requests.get(f"{base_url}{endpoint}", timeout=10)
-            if response.status_code == 200:
-                print(f"✅ {endpoint} - Status: {response.status_code}")
-            else:
-                print(f"⚠️  {endpoint} - Status: {response.status_code}")
-                success = False
+            return endpoint, client.get(endpoint).status_code, None
         except Exception as e:
-            print(f"❌ {endpoint} - Error: {e}")
+            return endpoint, None, e
+    
+    # Probe all endpoints concurrently, report in the original order
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        results = list(executor.map(check, endpoints))
+    
+    success = True
+    for endpoint, status_code, error in results:
+        if error is not None:
+            print(f"❌ {endpoint} - Error: {error}")
+            success = False
+        elif status_code == 200:
+            print(f"✅ {endpoint} - Status: {status_code}")
+        else:
+            print(f"⚠️  {endpoint} - Status: {status_code}")
             success = False
     
     return success
@@ -110,16 +110,14 @@ def main():
     print("\n2️⃣ Testing Package Imports:")
     imports_ok = test_imports()
     
-    # Test 3: Server startup and endpoints
+    # Test 3: App startup and endpoints
     print("\n3️⃣ Testing Server and Endpoints:")
-    server = start_test_server()
+    client = create_test_client()
     
-    if server:
-        endpoints_ok = test_endpoints()
-        
-        # Cleanup
-        server.terminate()
-        server.wait()
+    if client:
+        # Entering the client runs the app's startup/shutdown events
+        with client:
+            endpoints_ok = test_endpoints(client)
     else:
         endpoints_ok = False
     
@@ -1,15 +1,62 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+import asyncio
+from contextlib import contextmanager
 import duckdb
+import jinja2
+import hashlib
+import hmac
+import logging
+import math
+from logging.handlers import QueueHandler, QueueListener
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
 import os
-from datetime import datetime
+import queue
 import random
+import re
+import sys
+import threading
 import time
+from cachetools import TLRUCache, TTLCache
+from kernels import NUMBA_AVAILABLE
+if NUMBA_AVAILABLE:
+    from kernels import compute_signals
 
-app = FastAPI(title="Market Microstructure Analysis Platform")
+
+def orjson_default(obj):
+    # orjson only serializes C-contiguous arrays natively; DataFrame columns
+    # are often strided views into a 2D block
+    if isinstance(obj, np.ndarray):
+        return np.ascontiguousarray(obj)
+    raise TypeError
+
+
+class NumpyJSONResponse(JSONResponse):
+    """JSON response encoded with orjson, serializing numpy arrays natively"""
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=orjson_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+# Request threads only enqueue their log records; the QueueListener thread
+# does the formatting and the stdout writes
+logger = logging.getLogger("tradingview_app")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+log_queue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(log_queue))
+log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+log_listener.start()
+
+
+# Every JSON endpoint is encoded with orjson (numpy arrays included)
+app = FastAPI(title="Market Microstructure Analysis Platform", default_response_class=NumpyJSONResponse)
 
 # Add CORS middleware for web deployment
 app.add_middleware(
@@ -20,35 +67,504 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress the JSON payloads (long numeric arrays shrink several times over);
+# small responses and 304s are passed through untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Database configuration
 USE_MOTHERDUCK = os.getenv("USE_MOTHERDUCK", "false").lower() == "true"
 MOTHERDUCK_TOKEN = os.getenv("MOTHERDUCK_TOKEN")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "marketflow")
 LOCAL_DB_PATH = os.getenv("LOCAL_DATABASE_PATH", "/Users/george/Documents/GitHub/orderFlow_datamanager/taq_database.duckdb")
-
-def get_database_connection():
-    """Get database connection - MotherDuck for production, local for development"""
-    if USE_MOTHERDUCK and MOTHERDUCK_TOKEN:
+PARQUET_DATA_DIR = os.getenv("PARQUET_DATA_DIR")
+
+# Sorted list of every ticker in taq_1min and each ticker's dates (newest
+# first), loaded together with one scan at startup (or on first use) and
+# reloaded once they are SYMBOL_INDEX_TTL seconds old, so newly ingested
+# tickers and days show up. POST /admin/flush expires them to reload both on
+# the next use; the previous lists are served until the rescan completes
+SYMBOLS = None
+DATES_BY_SYMBOL = None
+SYMBOL_INDEX_TTL = int(os.getenv("SYMBOL_INDEX_TTL", os.getenv("RESPONSE_CACHE_TTL", "300")))
+symbol_index_expires = 0.0
+symbol_index_lock = threading.Lock()
+
+def symbol_index_stale():
+    """True while the ticker index is not loaded or older than SYMBOL_INDEX_TTL"""
+    return DATES_BY_SYMBOL is None or time.monotonic() >= symbol_index_expires
+
+def load_symbol_index(pool):
+    """Query SYMBOLS and DATES_BY_SYMBOL if they are not loaded yet or have
+    expired, and return DATES_BY_SYMBOL"""
+    global SYMBOLS, DATES_BY_SYMBOL, symbol_index_expires
+    dates_by_symbol = DATES_BY_SYMBOL
+    if symbol_index_stale():
+        # One thread rescans; the others wait and then use its result
+        with symbol_index_lock:
+            if symbol_index_stale():
+                with pool.acquire() as con:
+                    result = con.execute("""
+                        SELECT Ticker, list(DISTINCT Date ORDER BY Date DESC)
+                        FROM taq_1min
+                        GROUP BY Ticker
+                        ORDER BY Ticker
+                    """).fetchall()
+                SYMBOLS = [r[0] for r in result]
+                DATES_BY_SYMBOL = dict(result)
+                symbol_index_expires = time.monotonic() + SYMBOL_INDEX_TTL
+            dates_by_symbol = DATES_BY_SYMBOL
+    return dates_by_symbol
+
+def get_all_tickers(pool):
+    """Return the sorted ticker list"""
+    load_symbol_index(pool)
+    return SYMBOLS
+
+def get_ticker_dates(pool, symbol):
+    """Return the dates of symbol, newest first (empty for an unknown ticker)"""
+    return load_symbol_index(pool).get(symbol.upper(), [])
+
+# Unix timestamp of each bar, computed by DuckDB from the integer YYYYMMDD
+# Date and the bar start time (TIME or "HH:MM" string)
+PARSED_BAR_EPOCH_SQL = "CAST(EPOCH(make_date(Date // 10000, Date // 100 % 100, Date % 100) + CAST(TimeBarStart AS TIME)) AS BIGINT)"
+# Same value read from the t_epoch column written by add_indexes.py (rows
+# appended since then fall back to parsing)
+STORED_BAR_EPOCH_SQL = f"COALESCE(t_epoch, {PARSED_BAR_EPOCH_SQL})"
+# Bar time columns add_indexes.py writes (date_epoch / minute_of_day by earlier
+# versions of it), kept out of the raw data table
+STORED_BAR_TIME_COLUMNS = ["t_epoch", "date_epoch", "minute_of_day"]
+
+# Chosen once the database is opened
+BAR_EPOCH_SQL = PARSED_BAR_EPOCH_SQL
+RAW_DATA_COLUMNS_SQL = "* REPLACE (CAST(TimeBarStart AS VARCHAR) AS TimeBarStart)"
+
+# Bars of one ticker, optionally on one date: a NULL date matches every date,
+# so each endpoint runs the same query text with or without a date
+BAR_FILTER_SQL = "Ticker = ? AND (? IS NULL OR Date = ?)"
+
+def bar_filter_params(symbol, date):
+    """Parameters for BAR_FILTER_SQL"""
+    return [symbol.upper(), date, date]
+
+# Null handling for the bar columns, done by DuckDB: each column is forward
+# filled over the ordered bars and leading nulls become 0 (the same result
+# as df.ffill().fillna(0)). Columns declared NOT NULL in taq_1min have
+# nothing to fill and are read as they are
+BARS_WINDOW_SQL = "WINDOW bars AS (ORDER BY Date, TimeBarStart ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)"
+
+def filled_columns_sql(columns):
+    """SELECT list of forward filled columns, for queries using BARS_WINDOW_SQL"""
+    return ", ".join(
+        c if c in NOT_NULL_COLUMNS else f"COALESCE(LAST_VALUE({c} IGNORE NULLS) OVER bars, 0) AS {c}"
+        for c in columns
+    )
+
+# Chosen once the database is opened. Note add_indexes.py rewrites taq_1min
+# with CREATE OR REPLACE TABLE ... AS SELECT, which drops NOT NULL
+# constraints, so a table clustered by it (and the Parquet view) has none and
+# every column is filled
+NOT_NULL_COLUMNS = set()
+
+def detect_taq_columns(con):
+    """Use the stored bar timestamp when taq_1min has it, and note its NOT NULL columns"""
+    global BAR_EPOCH_SQL, RAW_DATA_COLUMNS_SQL, NOT_NULL_COLUMNS
+    # Only the taq_1min the queries resolve to, not same-named tables of other
+    # attached databases or schemas
+    result = con.execute("""
+        SELECT column_name, is_nullable FROM duckdb_columns()
+        WHERE table_name = 'taq_1min' AND database_name = current_database() AND schema_name = current_schema()
+    """).fetchall()
+    columns = {name for name, _ in result}
+    NOT_NULL_COLUMNS = {name for name, is_nullable in result if not is_nullable}
+    if "t_epoch" in columns:
+        logger.info("⏱️ Using stored bar timestamps")
+        BAR_EPOCH_SQL = STORED_BAR_EPOCH_SQL
+    stored = [c for c in STORED_BAR_TIME_COLUMNS if c in columns]
+    if stored:
+        RAW_DATA_COLUMNS_SQL = f"* EXCLUDE ({', '.join(stored)}) REPLACE (CAST(TimeBarStart AS VARCHAR) AS TimeBarStart)"
+
+# One long-lived connection per process; requests borrow a cursor on it from
+# a bounded pool (DUCKDB_POOL_SIZE, default one per CPU)
+DUCKDB_POOL_SIZE = int(os.getenv("DUCKDB_POOL_SIZE", str(os.cpu_count() or 4)))
+database_pool = None
+database_pool_lock = threading.Lock()
+
+class DuckDBPool:
+    """Fixed set of cursors on one connection; acquire() waits while all are in use"""
+    def __init__(self, connection, size):
+        self.connection = connection
+        self.cursors = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self.cursors.put(connection.cursor())
+    
+    @contextmanager
+    def acquire(self):
+        cursor = self.cursors.get()
+        try:
+            yield cursor
+        finally:
+            self.cursors.put(cursor)
+
+def open_database_connection():
+    """Open the database - MotherDuck for production, local for development"""
+    # Every API query selects one ticker's bars ordered by Date, TimeBarStart.
+    # taq_1min is expected to be stored sorted on (Ticker, Date, TimeBarStart)
+    # - run add_indexes.py after ingestion (export_parquet.py writes the same
+    # order) - so row group min/max statistics skip all other tickers
+    if PARQUET_DATA_DIR:
+        # Partitioned Parquet dataset written by export_parquet.py, exposed as a
+        # taq_1min view so the queries below work unchanged
+        logger.info(f"📦 Using Parquet dataset: {PARQUET_DATA_DIR}")
+        con = duckdb.connect()
+        dataset_glob = os.path.join(PARQUET_DATA_DIR, "Ticker=*", "*.parquet").replace("'", "''")
+        con.execute(f"""
+            CREATE VIEW taq_1min AS
+            SELECT Ticker, * EXCLUDE (Ticker)
+            FROM read_parquet('{dataset_glob}', hive_partitioning = true, hive_types = {{'Ticker': VARCHAR}})
+        """)
+        return con
+    elif USE_MOTHERDUCK and MOTHERDUCK_TOKEN:
         # Connect to MotherDuck cloud database
         connection_string = f"md:{DATABASE_NAME}?motherduck_token={MOTHERDUCK_TOKEN}"
-        print(f"🦆 Connecting to MotherDuck database: {DATABASE_NAME}")
+        logger.info(f"🦆 Connecting to MotherDuck database: {DATABASE_NAME}")
         return duckdb.connect(connection_string)
     else:
         # Fallback to local database for development
         if os.path.exists(LOCAL_DB_PATH):
-            print(f"📁 Using local database: {LOCAL_DB_PATH}")
+            logger.info(f"📁 Using local database: {LOCAL_DB_PATH}")
             # Use read_only=True to allow multiple connections
             return duckdb.connect(LOCAL_DB_PATH, read_only=True)
         else:
-            print("⚠️ No database available, using sample data")
+            logger.warning("⚠️ No database available, using sample data")
             return None
 
-templates = Jinja2Templates(directory="templates")
+# Optional DuckDB resource settings (unset = DuckDB's defaults: all cores and
+# 80% of RAM), so local development does not over-subscribe the machine
+DUCKDB_THREADS = os.getenv("DUCKDB_THREADS")
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT")
+
+def configure_database(con):
+    """Apply the DuckDB settings for this deployment to a new connection"""
+    settings = []
+    if DUCKDB_THREADS:
+        settings.append(("threads", int(DUCKDB_THREADS)))
+    if DUCKDB_MEMORY_LIMIT:
+        settings.append(("memory_limit", DUCKDB_MEMORY_LIMIT))
+    if PARQUET_DATA_DIR:
+        # Fetch the row groups a scan needs in batched reads (large win when
+        # the dataset lives on object storage)
+        settings.append(("prefetch_all_parquet_files", True))
+    for name, value in settings:
+        try:
+            con.execute(f"SET {name} = ?", [value])
+            logger.info(f"⚙️ DuckDB {name} = {value}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not set DuckDB {name}: {e}")
+
+def get_database_pool():
+    """Get the cursor pool on the shared database connection (None if no database is available)"""
+    global database_pool
+    if database_pool is None:
+        with database_pool_lock:
+            if database_pool is None:
+                connection = open_database_connection()
+                if connection is not None:
+                    configure_database(connection)
+                    detect_taq_columns(connection)
+                    build_queries()
+                    database_pool = DuckDBPool(connection, DUCKDB_POOL_SIZE)
+    return database_pool
+
+# SQL of each data query, specialized once per process (bar time expression,
+# column lists) when the database is opened; DuckDB's execute() then only
+# binds the parameters. The Python client cannot EXECUTE a SQL PREPARE with
+# bound parameters, so the text is what gets reused
+QUERIES = {}
+
+def build_queries():
+    """Fill QUERIES for the detected taq_1min layout"""
+    QUERIES["history"] = f"""
+        SELECT
+            {BAR_EPOCH_SQL} as t,
+            CAST(FirstTradePrice AS DOUBLE) as o,
+            CAST(HighTradePrice AS DOUBLE) as h, 
+            CAST(LowTradePrice AS DOUBLE) as l,
+            CAST(LastTradePrice AS DOUBLE) as c,
+            CAST(Volume AS INTEGER) as v
+        FROM taq_1min 
+        WHERE Ticker = ?
+        ORDER BY Date, TimeBarStart
+        LIMIT 1000
+    """
+    for name, spec in SPECS.items():
+        QUERIES[name] = f"""
+            SELECT {BAR_EPOCH_SQL} as t, {filled_columns_sql(list(spec["cols"]))}
+            FROM taq_1min
+            WHERE {BAR_FILTER_SQL}
+            {BARS_WINDOW_SQL}
+            ORDER BY Date, TimeBarStart
+        """
+    # Derived metrics are computed by DuckDB over the forward-filled bars
+    QUERIES["microstructure"] = f"""
+        WITH filled AS (
+            SELECT {BAR_EPOCH_SQL} as t, Date, TimeBarStart, {filled_columns_sql(MICROSTRUCTURE_COLUMNS)}
+            FROM taq_1min
+            WHERE {BAR_FILTER_SQL}
+            {BARS_WINDOW_SQL}
+        )
+        SELECT
+            t, {', '.join(MICROSTRUCTURE_COLUMNS)},
+            -- Buy Volume = TradeAtAsk + TradeAtMidAsk (aggressive + passive buying)
+            TradeAtAsk + TradeAtMidAsk AS buy_volume,
+            -- Sell Volume = TradeAtBid + TradeAtBidMid (aggressive + passive selling)
+            TradeAtBid + TradeAtBidMid AS sell_volume,
+            -- Delta = Buy - Sell (positive = buying pressure)
+            buy_volume - sell_volume AS delta,
+            CAST(SUM(delta) OVER bars AS BIGINT) AS cumulative_delta,
+            -- Tick Delta
+            UptickVolume + RepeatUptickVolume AS uptick_total,
+            DowntickVolume + RepeatDowntickVolume AS downtick_total,
+            uptick_total - downtick_total AS tick_delta,
+            CAST(SUM(tick_delta) OVER bars AS BIGINT) AS cumulative_tick_delta,
+            -- Order Book Imbalance
+            (OpenBidSize + CloseBidSize) / 2 AS bid_size,
+            (OpenAskSize + CloseAskSize) / 2 AS ask_size,
+            (bid_size - ask_size) / CASE WHEN bid_size + ask_size = 0 THEN 1 ELSE bid_size + ask_size END * 100 AS book_imbalance,
+            -- Delta percentage (normalized)
+            delta / CASE WHEN buy_volume + sell_volume = 0 THEN 1 ELSE buy_volume + sell_volume END * 100 AS delta_pct
+        FROM filled
+        {BARS_WINDOW_SQL}
+        ORDER BY Date, TimeBarStart
+    """
+    QUERIES["raw_count"] = f"""
+        SELECT COUNT(*) FROM taq_1min
+        WHERE {BAR_FILTER_SQL}
+    """
+    # Bar times as ISO strings, formatted by DuckDB
+    QUERIES["raw_page"] = f"""
+        SELECT {RAW_DATA_COLUMNS_SQL} FROM taq_1min
+        WHERE {BAR_FILTER_SQL}
+        ORDER BY Date, TimeBarStart
+        LIMIT ? OFFSET ?
+    """
+
+# Bars of the PRELOAD_SYMBOLS tickers (comma separated), loaded into memory
+# at startup so the chart endpoints can serve them without querying DuckDB.
+# Each value is (bars table, its Date column as a numpy array for slicing out
+# a day); reloads build a new dict and swap it in with one assignment
+PRELOAD_SYMBOLS = [s.strip().upper() for s in os.getenv("PRELOAD_SYMBOLS", "").split(",") if s.strip()]
+SYMBOL_BARS = {}
+
+def preload_symbol_bars():
+    """Load all bars of the PRELOAD_SYMBOLS tickers into SYMBOL_BARS"""
+    global SYMBOL_BARS
+    pool = get_database_pool()
+    if not pool or not PRELOAD_SYMBOLS:
+        return
+    
+    with pool.acquire() as con:
+        table = con.execute(f"""
+            SELECT {BAR_EPOCH_SQL} as t, *
+            FROM taq_1min
+            WHERE Ticker = ANY(?)
+            ORDER BY Ticker, Date, TimeBarStart
+        """, [PRELOAD_SYMBOLS]).fetch_arrow_table()
+    symbol_bars = {}
+    for symbol in PRELOAD_SYMBOLS:
+        bars = table.filter(pc.equal(table.column("Ticker"), symbol)).combine_chunks()
+        if bars.num_rows == 0:
+            logger.warning(f"⚠️ No bars for preload symbol {symbol}, skipping it")
+            continue
+        symbol_bars[symbol] = (bars, bars.column("Date").to_numpy())
+    SYMBOL_BARS = symbol_bars
+    logger.info(f"📦 Preloaded {table.num_rows} bars for {len(symbol_bars)} symbols")
+
+def get_preloaded_bars(symbol, date, columns):
+    """Return t plus columns for a preloaded symbol (optionally one date) as a
+    dict of numpy arrays, or None if the symbol is not preloaded"""
+    entry = SYMBOL_BARS.get(symbol.upper())
+    if entry is None:
+        return None
+    bars, dates = entry
+    if date:
+        # The bars are sorted by Date: binary search the day's bounds and take
+        # a zero-copy slice instead of masking every row
+        start, stop = np.searchsorted(dates, date, side="left"), np.searchsorted(dates, date, side="right")
+        bars = bars.slice(start, stop - start)
+    bars = fill_arrow_table(bars.select(["t"] + columns))
+    return {name: bars.column(name).to_numpy() for name in bars.column_names}
+
+# Encoded responses of the data endpoints, keyed by (endpoint, symbol, date).
+# The data only changes on ingestion, so entries live for RESPONSE_CACHE_TTL
+# seconds (HISTORIC_CACHE_TTL for past dates) and can be dropped early with
+# POST /admin/flush
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+HISTORIC_CACHE_TTL = int(os.getenv("HISTORIC_CACHE_TTL", "3600"))
+
+def cache_ttl(key):
+    """Seconds a cached response stays fresh: a past date's bars are final,
+    all-dates and today's responses change as new bars are ingested"""
+    date = key[2]
+    if date and date < int(time.strftime("%Y%m%d")):
+        return HISTORIC_CACHE_TTL
+    return RESPONSE_CACHE_TTL
+
+RESPONSE_CACHE = TLRUCache(
+    maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "2048")),
+    ttu=lambda key, value, now: now + cache_ttl(key),
+)
+response_cache_lock = threading.Lock()
+
+# Default (all dates) responses of the PRELOAD_SYMBOLS tickers, encoded once at
+# startup and pinned (never evicted for space) for the same TTL as the
+# response cache, after which requests rebuild them like any other response
+PRECOMPUTED = TLRUCache(
+    maxsize=math.inf,
+    ttu=lambda key, value, now: now + cache_ttl(key),
+)
+
+def cache_headers(key, etag):
+    """ETag / Cache-Control headers for a cached payload (clients may reuse it for the cache TTL).
+    The ETag is weak because GZipMiddleware sends the same one for the gzip and identity bodies"""
+    return {"ETag": f'W/"{etag}"', "Cache-Control": f"public, max-age={cache_ttl(key)}"}
+
+def etag_matches(request, etag):
+    """True if the request's If-None-Match lists etag, as a weak or strong tag (or is *)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or f'"{etag}"' in tags
+
+def store_payload(key, payload):
+    """Cache encoded bytes under key together with their ETag; returns the ETag"""
+    etag = hashlib.blake2b(payload, digest_size=8).hexdigest()
+    with response_cache_lock:
+        RESPONSE_CACHE[key] = (payload, etag)
+    return etag
+
+def get_cached_response(key, request):
+    """Return a cached response for key (304 if the client already has it), or None"""
+    with response_cache_lock:
+        entry = PRECOMPUTED.get(key) or RESPONSE_CACHE.get(key)
+    if entry is None:
+        return None
+    payload, etag = entry
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=cache_headers(key, etag))
+    return Response(content=payload, media_type="application/json", headers=cache_headers(key, etag))
+
+def cache_response(key, content):
+    """Encode content, store the bytes under key and return the response"""
+    response = NumpyJSONResponse(content)
+    response.headers.update(cache_headers(key, store_payload(key, response.body)))
+    return response
+
+def stream_json_object(content):
+    """Yield the JSON encoding of the content dict one member at a time (same
+    bytes as NumpyJSONResponse), so the first arrays go out while later ones
+    are still being encoded"""
+    separator = b'{'
+    for name, value in content.items():
+        yield separator + orjson.dumps(name) + b':' + orjson.dumps(value, default=orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+        separator = b','
+    yield b'}'
+
+def stream_response(key, content):
+    """Stream content as JSON and cache the full payload once it has been sent"""
+    return StreamingResponse(stream_and_cache(key, stream_json_object(content)), media_type="application/json")
+
+def stream_and_cache(key, chunks):
+    """Pass streamed chunks through and cache the full payload once complete"""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    store_payload(key, b''.join(parts))
+
+# Answer for a symbol/date without bars, encoded once and shared by every key
+# (never stored in RESPONSE_CACHE, so unknown symbols cannot evict real payloads)
+_NO_DATA_PAYLOAD = orjson.dumps({"s": "no_data"})
+_NO_DATA_ETAG = hashlib.blake2b(_NO_DATA_PAYLOAD, digest_size=8).hexdigest()
+
+def no_data_response(key):
+    """The shared no_data answer for key"""
+    return Response(content=_NO_DATA_PAYLOAD, media_type="application/json", headers=cache_headers(key, _NO_DATA_ETAG))
+
+async def serve_cached(request, key, build, *args):
+    """Answer from the response cache on the event loop; otherwise run
+    build(key, *args) - the blocking DuckDB query and encoding - in a worker thread"""
+    cached = get_cached_response(key, request)
+    if cached:
+        return cached
+    return await asyncio.to_thread(build, key, *args)
+
+@app.on_event("shutdown")
+def stop_log_listener():
+    """Write out the queued log records before the process exits"""
+    log_listener.stop()
+
+@app.on_event("startup")
+def load_preloaded_symbols():
+    try:
+        preload_symbol_bars()
+    except Exception:
+        logger.exception("Error preloading symbols")
+
+@app.on_event("startup")
+def load_symbols():
+    try:
+        pool = get_database_pool()
+        if pool:
+            load_symbol_index(pool)
+            logger.info(f"🔤 Indexed dates of {len(SYMBOLS)} tickers")
+    except Exception:
+        logger.exception("Error loading the ticker list")
+
+# Page templates are compiled once and kept: without auto_reload Jinja no longer
+# stats the file on every render (set TEMPLATE_AUTO_RELOAD=true when editing them)
+PAGE_TEMPLATES = (
+    "index.html", "spread_new.html", "vwap.html", "volume.html", "liquidity.html", "flow.html",
+    "accumulation.html", "delta.html", "signal.html", "docs.html", "data_table.html",
+)
+templates = Jinja2Templates(env=jinja2.Environment(
+    loader=jinja2.FileSystemLoader("templates"),
+    autoescape=True,
+    auto_reload=os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true",
+))
+
+@app.on_event("startup")
+def load_templates():
+    for name in PAGE_TEMPLATES:
+        templates.get_template(name)
 
 # Serve static files (TradingView JS, etc.)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+def stream_history_json(table):
+    """Yield a TradingView history payload ({"t": [...], ..., "s": "ok"})
+    column by column, so encoding one array overlaps sending the previous one"""
+    separator = b'{'
+    for name in ('t', 'o', 'h', 'l', 'c', 'v'):
+        column = table.column(name)
+        # numpy has no integer null, so columns with nulls go through Python lists
+        values = column.to_numpy() if column.null_count == 0 else column.to_pylist()
+        yield separator + b'"' + name.encode() + b'":' + orjson.dumps(values, option=orjson.OPT_SERIALIZE_NUMPY)
+        separator = b','
+    yield b',"s":"ok"}'
+
+
+def fill_arrow_table(table):
+    """Forward fill nulls in every column of an Arrow table, then fill any
+    leading nulls with 0 (same result as df.ffill().fillna(0)); columns
+    without nulls are passed through as they are"""
+    return pa.table({
+        name: pc.fill_null(pc.fill_null_forward(column), 0) if column.null_count else column
+        for name, column in zip(table.column_names, table.columns)
+    })
+
+
 def generate_sample_data():
     """Generate sample market data for demonstration"""
     import random
@@ -82,7 +598,7 @@ def generate_sample_data():
 # -----------------------------
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request, symbol: str = "AMD"):
-    return templates.TemplateResponse("index.html", {"request": request, "symbol": symbol})
+    return templates.TemplateResponse(request, "index.html", {"symbol": symbol})
 
 
 @app.get("/test")
@@ -93,456 +609,254 @@ def test_endpoint():
 
 @app.get("/spread")
 def spread_page(request: Request, symbol: str = "AMD"):
-    return templates.TemplateResponse("spread_new.html", {"request": request, "symbol": symbol})
+    return templates.TemplateResponse(request, "spread_new.html", {"symbol": symbol})
 
 @app.get("/vwap")
 def vwap_page(request: Request, symbol: str = "AMD"):
-    return templates.TemplateResponse("vwap.html", {"request": request, "symbol": symbol})
+    return templates.TemplateResponse(request, "vwap.html", {"symbol": symbol})
 
 
 @app.get("/volume")
 def volume_page(request: Request, symbol: str = "AMD"):
-    return templates.TemplateResponse("volume.html", {"request": request, "symbol": symbol})
+    return templates.TemplateResponse(request, "volume.html", {"symbol": symbol})
 
 
 @app.get("/liquidity")
 def liquidity_page(request: Request, symbol: str = "AMD"):
-    return templates.TemplateResponse("liquidity.html", {"request": request, "symbol": symbol})
+    return templates.TemplateResponse(request, "liquidity.html", {"symbol": symbol})
 
 
 @app.get("/flow")
 def flow_page(request: Request, symbol: str = "AMD"):
-    return templates.TemplateResponse("flow.html", {"request": request, "symbol": symbol})
+    return templates.TemplateResponse(request, "flow.html", {"symbol": symbol})
 
 
 @app.get("/accumulation")
 def accumulation_page(request: Request, symbol: str = "AMD"):
-    return templates.TemplateResponse("accumulation.html", {"request": request, "symbol": symbol})
+    return templates.TemplateResponse(request, "accumulation.html", {"symbol": symbol})
 
 
 @app.get("/delta")
 def delta_page(request: Request, symbol: str = "AMD"):
-    return templates.TemplateResponse("delta.html", {"request": request, "symbol": symbol})
+    return templates.TemplateResponse(request, "delta.html", {"symbol": symbol})
 
 
 @app.get("/signal")
 def signal_page(request: Request, symbol: str = "AMD"):
-    return templates.TemplateResponse("signal.html", {"request": request, "symbol": symbol})
+    return templates.TemplateResponse(request, "signal.html", {"symbol": symbol})
 
 
 @app.get("/documentation")
 def docs_page(request: Request):
-    return templates.TemplateResponse("docs.html", {"request": request})
+    return templates.TemplateResponse(request, "docs.html")
 
 
 @app.get("/data")
 def data_table_page(request: Request, symbol: str = "AMD", date: int = None):
-    return templates.TemplateResponse("data_table.html", {"request": request, "symbol": symbol, "date": date})
+    return templates.TemplateResponse(request, "data_table.html", {"symbol": symbol, "date": date})
+
+
+# Secret for the admin endpoints, sent in the X-Admin-Token header; without
+# ADMIN_TOKEN they are not registered at all
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+async def flush_cache(x_admin_token: str = Header(None)):
+    """Drop all cached API responses and the ticker list (e.g. after new data is ingested),
+    then reload and re-encode the preloaded symbols"""
+    global symbol_index_expires
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    with response_cache_lock:
+        flushed = len(RESPONSE_CACHE) + len(PRECOMPUTED)
+        RESPONSE_CACHE.clear()
+        PRECOMPUTED.clear()
+    with microstructure_lock:
+        MICROSTRUCTURE_BARS.clear()
+    symbol_index_expires = 0.0
+    await asyncio.to_thread(load_symbols)
+    await asyncio.to_thread(preload_symbol_bars)
+    await precompute_responses()
+    return {"status": "ok", "flushed": flushed}
+
+if ADMIN_TOKEN:
+    app.post("/admin/flush")(flush_cache)
 
 
 # -----------------------------
 # 🔍 Data API for chart
 # -----------------------------
-@app.get("/api/history")
-def get_history(symbol: str, resolution: str = "60", from_: int = 0, to: int = 9999999999):
-    """Get OHLC data for TradingView"""
+def build_history(cache_key, symbol):
+    """Query and stream the TradingView OHLC payload of symbol"""
     try:
-        con = get_database_connection()
-        if not con:
+        pool = get_database_pool()
+        if not pool:
             # Return sample data if no database available
             return generate_sample_data()
         
-        query = """
-        SELECT
-            CAST(EXTRACT(EPOCH FROM TimeBarStart) AS INTEGER) as t,
-            CAST(Open AS DOUBLE) as o,
-            CAST(High AS DOUBLE) as h, 
-            CAST(Low AS DOUBLE) as l,
-            CAST(Close AS DOUBLE) as c,
-            CAST(Volume AS INTEGER) as v
-        FROM taq_1min 
-        WHERE Ticker = ?
-        ORDER BY TimeBarStart
-        LIMIT 1000
-        """
-        
-        result = con.execute(query, [symbol]).fetchall()
-        con.close()
+        with pool.acquire() as con:
+            table = con.execute(QUERIES["history"], [symbol]).fetch_arrow_table()
         
-        if not result:
-            return {"s": "no_data"}
+        if table.num_rows == 0:
+            return no_data_response(cache_key)
         
-        # Convert to TradingView format
-        data = {
-            't': [r[0] for r in result],
-            'o': [r[1] for r in result],
-            'h': [r[2] for r in result],
-            'l': [r[3] for r in result],
-            'c': [r[4] for r in result],
-            'v': [r[5] for r in result],
-            's': 'ok'
-        }
-        return data
+        # Stream the TradingView payload one column at a time
+        return StreamingResponse(stream_and_cache(cache_key, stream_history_json(table)), media_type="application/json")
         
-    except Exception as e:
-        print(f"Error in get_history: {e}")
+    except Exception:
+        logger.exception("Error in get_history")
         return generate_sample_data()
 
 
-# -----------------------------
-# � Spread data endpoint
-# -----------------------------
-@app.get("/api/spread")
-def get_spread_data(symbol: str, date: int = None):
-    """Get min and max spread data for overlay"""
-    try:
-        con = get_database_connection()
-        if not con:
-            # Return sample spread data
-            return {"s": "ok", "min_spread": [0.01, 0.015, 0.012], "max_spread": [0.02, 0.025, 0.022]}
-        
-        date_filter = f"AND Date = {date}" if date else ""
-        query = f"""
-        SELECT 
-            TimeBarStart,
-            MinSpread,
-            MaxSpread,
-            LastTradePrice,
-            Date
-        FROM taq_1min
-        WHERE Ticker = '{symbol.upper()}' {date_filter}
-        ORDER BY Date, TimeBarStart
-        """
-        df = con.execute(query).df()
-
-        if df.empty:
-            return {"s": "no_data"}
-
-        # Convert time format to timestamps for TradingView
-        timestamps = []
-        for idx, row in df.iterrows():
-            time_val = row["TimeBarStart"]
-            date_val = row["Date"]
-            # Handle both datetime.time objects and strings
-            if hasattr(time_val, 'hour'):
-                hour, minute = time_val.hour, time_val.minute
-            else:
-                hour, minute = map(int, str(time_val).split(':')[:2])
-            # Convert integer date (YYYYMMDD) to year, month, day
-            year = date_val // 10000
-            month = (date_val % 10000) // 100
-            day = date_val % 100
-            dt = datetime(year, month, day, hour, minute)
-            timestamps.append(int(dt.timestamp()))
-
-        # Handle NaN values in spread data
-        df = df.ffill()  # Forward fill NaN values
-        df = df.fillna(0)  # Fill any remaining NaN with 0
-
-        return {
-            "s": "ok",
-            "t": timestamps,
-            "min_spread": df["MinSpread"].tolist(),
-            "max_spread": df["MaxSpread"].tolist(),
-            "last_price": df["LastTradePrice"].tolist(),
-        }
-        
-    except Exception as e:
-        print(f"Error in get_spread_data: {e}")
-        # Return sample spread data
-        return {"s": "ok", "min_spread": [0.01, 0.015, 0.012], "max_spread": [0.02, 0.025, 0.022]}
+@app.get("/api/history")
+async def get_history(request: Request, symbol: str, resolution: str = "60", from_: int = 0, to: int = 9999999999):
+    """Get OHLC data for TradingView"""
+    symbol = symbol.upper()
+    return await serve_cached(request, ("history", symbol, None), build_history, symbol)
 
 
 # -----------------------------
-# � VWAP and other indicators endpoint
+# 📊 Bar series endpoints (spread, indicators, volume, liquidity, flow)
 # -----------------------------
-@app.get("/api/indicators")
-def get_indicators(symbol: str, date: int = None):
-    """Get VWAP and other technical indicators for overlay"""
+# Each endpoint returns t plus a forward-filled series per column, renamed
+# from the taq_1min column to its JSON key; sample is the no-database fallback
+SPECS = {
+    "spread": {
+        "cols": {
+            "MinSpread": "min_spread",
+            "MaxSpread": "max_spread",
+            "LastTradePrice": "last_price",
+        },
+        "sample": {"s": "ok", "min_spread": [0.01, 0.015, 0.012], "max_spread": [0.02, 0.025, 0.022]},
+    },
+    "indicators": {
+        "cols": {
+            "VolumeWeightPrice": "vwap",
+            "TradeAtBid": "trade_at_bid",
+            "TradeAtAsk": "trade_at_ask",
+            "TotalTrades": "total_trades",
+            "LastTradePrice": "last_price",
+        },
+        "sample": {"s": "ok", "vwap": [150.5, 151.2, 150.8], "total_trades": [100, 120, 95]},
+    },
+    "volume": {
+        "cols": {
+            "Volume": "volume",
+            "TotalTrades": "total_trades",
+            "UptickVolume": "uptick_volume",
+            "DowntickVolume": "downtick_volume",
+            "RepeatUptickVolume": "repeat_uptick",
+            "RepeatDowntickVolume": "repeat_downtick",
+            "UnknownTickVolume": "unknown_tick",
+            "LastTradePrice": "last_price",
+        },
+        "sample": {"s": "ok", "volume": [1000, 1200, 950], "total_trades": [50, 60, 45]},
+    },
+    "liquidity": {
+        "cols": {
+            "OpenBidSize": "open_bid_size",
+            "OpenAskSize": "open_ask_size",
+            "CloseBidSize": "close_bid_size",
+            "CloseAskSize": "close_ask_size",
+            "NBBOQuoteCount": "nbbo_quote_count",
+            "TimeWeightBid": "time_weight_bid",
+            "TimeWeightAsk": "time_weight_ask",
+            "LastTradePrice": "last_price",
+        },
+        "sample": {"s": "ok", "open_bid_size": [100, 150, 200], "open_ask_size": [120, 180, 220]},
+    },
+    "flow": {
+        "cols": {
+            "TradeAtBid": "trade_at_bid",
+            "TradeAtBidMid": "trade_at_bid_mid",
+            "TradeAtMid": "trade_at_mid",
+            "TradeAtMidAsk": "trade_at_mid_ask",
+            "TradeAtAsk": "trade_at_ask",
+            "TradeAtCrossOrLocked": "trade_at_cross",
+            "TradeToMidVolWeight": "trade_to_mid_weight",
+            "TradeToMidVolWeightRelative": "trade_to_mid_relative",
+            "LastTradePrice": "last_price",
+        },
+        "sample": {"s": "ok", "trade_at_bid": [50, 60, 45], "trade_at_ask": [40, 55, 35]},
+    },
+}
+
+def build_bar_series(cache_key, name, symbol, date):
+    """Query and encode the SPECS[name] series for symbol (optionally one date)"""
+    spec = SPECS[name]
     try:
-        con = get_database_connection()
-        if not con:
+        pool = get_database_pool()
+        if not pool:
             # Return sample data
-            return {"s": "ok", "vwap": [150.5, 151.2, 150.8], "total_trades": [100, 120, 95]}
+            return spec["sample"]
         
-        date_filter = f"AND Date = {date}" if date else ""
-        query = f"""
-            SELECT 
-                TimeBarStart,
-                VolumeWeightPrice as vwap,
-                TradeAtBid,
-                TradeAtAsk,
-                TotalTrades,
-                LastTradePrice,
-                Date
-            FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}' {date_filter}
-            ORDER BY Date, TimeBarStart
-        """
-        df = con.execute(query).df()
-
-        if df.empty:
-            return {"s": "no_data"}
-
-        # Handle NaN values
-        df = df.ffill()
-        df = df.fillna(0)
-
-        # Convert time format to timestamps
-        timestamps = []
-        for idx, row in df.iterrows():
-            time_val = row["TimeBarStart"]
-            date_val = row["Date"]
-            # Handle both datetime.time objects and strings
-            if hasattr(time_val, 'hour'):
-                hour, minute = time_val.hour, time_val.minute
-            else:
-                hour, minute = map(int, str(time_val).split(':')[:2])
-            # Convert integer date (YYYYMMDD) to year, month, day
-            year = date_val // 10000
-            month = (date_val % 10000) // 100
-            day = date_val % 100
-            dt = datetime(year, month, day, hour, minute)
-            timestamps.append(int(dt.timestamp()))
-
-        return {
-            "s": "ok",
-            "t": timestamps,
-            "vwap": df["vwap"].tolist(),
-            "trade_at_bid": df["TradeAtBid"].tolist(),
-            "trade_at_ask": df["TradeAtAsk"].tolist(),
-            "total_trades": df["TotalTrades"].tolist(),
-            "last_price": df["LastTradePrice"].tolist(),
-        }
+        params = bar_filter_params(symbol, date)
+        bars = get_preloaded_bars(symbol, date, list(spec["cols"]))
+        if bars is None:
+            with pool.acquire() as con:
+                bars = con.execute(QUERIES[name], params).fetchnumpy()
         
-    except Exception as e:
-        print(f"Error in get_indicators: {e}")
-        return {"s": "ok", "vwap": [150.5, 151.2, 150.8], "total_trades": [100, 120, 95]}
-
-
-# -----------------------------
-# Symbol search endpoint (optional)
-# -----------------------------
-@app.get("/api/volume")
-def get_volume_data(symbol: str, date: int = None):
-    try:
-        con = get_database_connection()
-        if not con:
-            # Return sample data
-            return {"s": "ok", "volume": [1000, 1200, 950], "total_trades": [50, 60, 45]}
+        if len(bars["t"]) == 0:
+            return no_data_response(cache_key)
         
-        date_filter = f"AND Date = {date}" if date else ""
-        query = f"""
-            SELECT
-                TimeBarStart,
-                Volume,
-                TotalTrades,
-                UptickVolume,
-                DowntickVolume,
-                RepeatUptickVolume,
-                RepeatDowntickVolume,
-                UnknownTickVolume,
-                LastTradePrice,
-                Date
-            FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}' {date_filter}
-            ORDER BY Date, TimeBarStart
-        """
-        df = con.execute(query).df()
+        content = {"s": "ok", "t": bars["t"]}
+        for column, key in spec["cols"].items():
+            content[key] = bars[column]
+        return cache_response(cache_key, content)
+        
+    except Exception:
+        logger.exception("Error in %s endpoint", name)
+        return spec["sample"]
 
-        if df.empty:
-            return {"s": "no_data"}
 
-        df = df.ffill().fillna(0)
-        timestamps = []
-        for idx, row in df.iterrows():
-            time_val = row["TimeBarStart"]
-            date_val = row["Date"]
-            # Handle both datetime.time objects and strings
-            if hasattr(time_val, 'hour'):
-                hour, minute = time_val.hour, time_val.minute
-            else:
-                hour, minute = map(int, str(time_val).split(':')[:2])
-            # Convert integer date (YYYYMMDD) to year, month, day
-            year = date_val // 10000
-            month = (date_val % 10000) // 100
-            day = date_val % 100
-            dt = datetime(year, month, day, hour, minute)
-            timestamps.append(int(dt.timestamp()))
+@app.get("/api/spread")
+async def get_spread_data(request: Request, symbol: str, date: int = None):
+    """Get min and max spread data for overlay"""
+    return await serve_cached(request, ("spread", symbol.upper(), date), build_bar_series, "spread", symbol, date)
 
-        return {
-            "s": "ok",
-            "t": timestamps,
-            "volume": df["Volume"].tolist(),
-            "total_trades": df["TotalTrades"].tolist(),
-            "uptick_volume": df["UptickVolume"].tolist(),
-            "downtick_volume": df["DowntickVolume"].tolist(),
-            "repeat_uptick": df["RepeatUptickVolume"].tolist(),
-            "repeat_downtick": df["RepeatDowntickVolume"].tolist(),
-            "unknown_tick": df["UnknownTickVolume"].tolist(),
-            "last_price": df["LastTradePrice"].tolist(),
-        }
-        
-    except Exception as e:
-        print(f"Error in get_volume_data: {e}")
-        return {"s": "ok", "volume": [1000, 1200, 950], "total_trades": [50, 60, 45]}
 
+@app.get("/api/indicators")
+async def get_indicators(request: Request, symbol: str, date: int = None):
+    """Get VWAP and other technical indicators for overlay"""
+    return await serve_cached(request, ("indicators", symbol.upper(), date), build_bar_series, "indicators", symbol, date)
 
-@app.get("/api/liquidity")
-def get_liquidity_data(symbol: str, date: int = None):
-    try:
-        con = get_database_connection()
-        if not con:
-            # Return sample data
-            return {"s": "ok", "open_bid_size": [100, 150, 200], "open_ask_size": [120, 180, 220]}
-        
-        date_filter = f"AND Date = {date}" if date else ""
-        query = f"""
-            SELECT
-                TimeBarStart,
-                OpenBidSize,
-                OpenAskSize,
-                CloseBidSize,
-                CloseAskSize,
-                NBBOQuoteCount,
-                TimeWeightBid,
-                TimeWeightAsk,
-                LastTradePrice,
-                Date
-            FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}' {date_filter}
-            ORDER BY Date, TimeBarStart
-        """
-        df = con.execute(query).df()
 
-        if df.empty:
-            return {"s": "no_data"}
+@app.get("/api/volume")
+async def get_volume_data(request: Request, symbol: str, date: int = None):
+    return await serve_cached(request, ("volume", symbol.upper(), date), build_bar_series, "volume", symbol, date)
 
-        df = df.ffill().fillna(0)
-        timestamps = []
-        for idx, row in df.iterrows():
-            time_val = row["TimeBarStart"]
-            date_val = row["Date"]
-            # Handle both datetime.time objects and strings
-            if hasattr(time_val, 'hour'):
-                hour, minute = time_val.hour, time_val.minute
-            else:
-                hour, minute = map(int, str(time_val).split(':')[:2])
-            # Convert integer date (YYYYMMDD) to year, month, day
-            year = date_val // 10000
-            month = (date_val % 10000) // 100
-            day = date_val % 100
-            dt = datetime(year, month, day, hour, minute)
-            timestamps.append(int(dt.timestamp()))
 
-        return {
-            "s": "ok",
-            "t": timestamps,
-            "open_bid_size": df["OpenBidSize"].tolist(),
-            "open_ask_size": df["OpenAskSize"].tolist(),
-            "close_bid_size": df["CloseBidSize"].tolist(),
-            "close_ask_size": df["CloseAskSize"].tolist(),
-            "nbbo_quote_count": df["NBBOQuoteCount"].tolist(),
-            "time_weight_bid": df["TimeWeightBid"].tolist(),
-            "time_weight_ask": df["TimeWeightAsk"].tolist(),
-            "last_price": df["LastTradePrice"].tolist(),
-        }
-        
-    except Exception as e:
-        print(f"Error in get_liquidity_data: {e}")
-        return {"s": "ok", "open_bid_size": [100, 150, 200], "open_ask_size": [120, 180, 220]}
+@app.get("/api/liquidity")
+async def get_liquidity_data(request: Request, symbol: str, date: int = None):
+    return await serve_cached(request, ("liquidity", symbol.upper(), date), build_bar_series, "liquidity", symbol, date)
 
 
 @app.get("/api/flow")
-def get_flow_data(symbol: str, date: int = None):
-    try:
-        con = get_database_connection()
-        if not con:
-            # Return sample data
-            return {"s": "ok", "trade_at_bid": [50, 60, 45], "trade_at_ask": [40, 55, 35]}
-        
-        date_filter = f"AND Date = {date}" if date else ""
-        query = f"""
-            SELECT
-                TimeBarStart,
-                TradeAtBid,
-                TradeAtBidMid,
-                TradeAtMid,
-                TradeAtMidAsk,
-                TradeAtAsk,
-                TradeAtCrossOrLocked,
-                TradeToMidVolWeight,
-                TradeToMidVolWeightRelative,
-                LastTradePrice,
-                Date
-            FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}' {date_filter}
-            ORDER BY Date, TimeBarStart
-        """
-        df = con.execute(query).df()
+async def get_flow_data(request: Request, symbol: str, date: int = None):
+    return await serve_cached(request, ("flow", symbol.upper(), date), build_bar_series, "flow", symbol, date)
 
-        if df.empty:
-            return {"s": "no_data"}
-
-        df = df.ffill().fillna(0)
-        timestamps = []
-        for idx, row in df.iterrows():
-            time_val = row["TimeBarStart"]
-            date_val = row["Date"]
-            # Handle both datetime.time objects and strings
-            if hasattr(time_val, 'hour'):
-                hour, minute = time_val.hour, time_val.minute
-            else:
-                hour, minute = map(int, str(time_val).split(':')[:2])
-            # Convert integer date (YYYYMMDD) to year, month, day
-            year = date_val // 10000
-            month = (date_val % 10000) // 100
-            day = date_val % 100
-            dt = datetime(year, month, day, hour, minute)
-            timestamps.append(int(dt.timestamp()))
-
-        return {
-            "s": "ok",
-            "t": timestamps,
-            "trade_at_bid": df["TradeAtBid"].tolist(),
-            "trade_at_bid_mid": df["TradeAtBidMid"].tolist(),
-            "trade_at_mid": df["TradeAtMid"].tolist(),
-            "trade_at_mid_ask": df["TradeAtMidAsk"].tolist(),
-            "trade_at_ask": df["TradeAtAsk"].tolist(),
-            "trade_at_cross": df["TradeAtCrossOrLocked"].tolist(),
-            "trade_to_mid_weight": df["TradeToMidVolWeight"].tolist(),
-            "trade_to_mid_relative": df["TradeToMidVolWeightRelative"].tolist(),
-            "last_price": df["LastTradePrice"].tolist(),
-        }
-        
-    except Exception as e:
-        print(f"Error in get_flow_data: {e}")
-        return {"s": "ok", "trade_at_bid": [50, 60, 45], "trade_at_ask": [40, 55, 35]}
 
+# Ticker search input: letters and dots only (e.g. BRK.B), at most 8 characters
+SYMBOL_RE = re.compile(r"[A-Za-z.]{1,8}")
 
 @app.get("/api/symbols")
 def search_symbol(symbol: str = ""):
+    # Reject anything that cannot be part of a ticker before touching the database
+    if symbol and not SYMBOL_RE.fullmatch(symbol):
+        raise HTTPException(status_code=400, detail="Invalid symbol")
     try:
-        con = get_database_connection()
-        if not con:
+        pool = get_database_pool()
+        if not pool:
             return ["AMD", "MSFT", "GOOGL", "NVDA", "INTC"]
         
+        # Filter the in-memory ticker list instead of scanning per keystroke
+        tickers = get_all_tickers(pool)
         if symbol:
-            result = con.execute(f"""
-                SELECT DISTINCT Ticker FROM taq_1min
-                WHERE UPPER(Ticker) LIKE UPPER('%{symbol}%')
-                ORDER BY Ticker
-                LIMIT 20
-            """).fetchall()
-        else:
-            result = con.execute("""
-                SELECT DISTINCT Ticker FROM taq_1min
-                ORDER BY Ticker
-            """).fetchall()
-        return [r[0] for r in result]
+            query = symbol.upper()
+            return [t for t in tickers if query in t.upper()][:20]
+        return tickers
         
-    except Exception as e:
-        print(f"Error in search_symbol: {e}")
+    except Exception:
+        logger.exception("Error in search_symbol")
         return ["AMD", "MSFT", "GOOGL", "NVDA", "INTC"]
 
 
@@ -550,407 +864,368 @@ def search_symbol(symbol: str = ""):
 def get_available_dates(symbol: str):
     """Get available dates for a specific ticker"""
     try:
-        con = get_database_connection()
-        if not con:
+        pool = get_database_pool()
+        if not pool:
             return {"dates": [20200128]}
         
-        result = con.execute(f"""
-            SELECT DISTINCT Date FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}'
-            ORDER BY Date DESC
-        """).fetchall()
-        dates = [r[0] for r in result]
+        dates = get_ticker_dates(pool, symbol)
         return {"dates": dates, "count": len(dates)}
         
     except Exception as e:
-        print(f"Error in get_available_dates: {e}")
+        logger.exception("Error in get_available_dates")
         return {"dates": [], "error": str(e)}
 
 
-@app.get("/api/accumulation")
-def get_accumulation_data(symbol: str, date: int = None):
-    """Get accumulation/distribution and buying pressure data"""
+# -----------------------------
+# 📈 Order flow endpoints (accumulation, delta, signal)
+# -----------------------------
+# The three endpoints share one query: the union of their bar columns plus the
+# order flow metrics derived from them. The fetched arrays are kept for a short
+# while so a chart page loading all three scans taq_1min once
+MICROSTRUCTURE_COLUMNS = [
+    "TradeAtBid", "TradeAtBidMid", "TradeAtMid", "TradeAtMidAsk", "TradeAtAsk",
+    "TradeAtCrossOrLocked", "Volume", "TotalTrades", "UptickVolume", "DowntickVolume",
+    "RepeatUptickVolume", "RepeatDowntickVolume", "OpenBidSize", "OpenAskSize",
+    "CloseBidSize", "CloseAskSize", "FirstTradePrice", "LastTradePrice",
+    "HighTradePrice", "LowTradePrice", "VolumeWeightPrice", "TradeToMidVolWeight",
+    "TradeToMidVolWeightRelative", "MinSpread", "MaxSpread",
+]
+MICROSTRUCTURE_BARS = TTLCache(maxsize=64, ttl=RESPONSE_CACHE_TTL)
+microstructure_lock = threading.Lock()
+
+def load_microstructure(pool, symbol, date):
+    """Fetch the forward-filled order flow bars of symbol (optionally one date)
+    with their derived metrics, as a dict of numpy arrays"""
+    key = (symbol.upper(), date)
+    with microstructure_lock:
+        bars = MICROSTRUCTURE_BARS.get(key)
+    if bars is not None:
+        return bars
+    
+    with pool.acquire() as con:
+        bars = con.execute(QUERIES["microstructure"], bar_filter_params(symbol, date)).fetchnumpy()
+    with microstructure_lock:
+        MICROSTRUCTURE_BARS[key] = bars
+    return bars
+
+
+def build_accumulation_data(cache_key, symbol, date):
     try:
-        con = get_database_connection()
-        if not con:
+        pool = get_database_pool()
+        if not pool:
             return {"s": "no_data"}
         
-        date_filter = f"AND Date = {date}" if date else ""
-        query = f"""
-            SELECT
-                TimeBarStart,
-                Date,
-                TradeAtBid,
-                TradeAtBidMid,
-                TradeAtMid,
-                TradeAtMidAsk,
-                TradeAtAsk,
-                TradeAtCrossOrLocked,
-                Volume,
-                TotalTrades,
-                UptickVolume,
-                DowntickVolume,
-                RepeatUptickVolume,
-                RepeatDowntickVolume,
-                OpenBidSize,
-                OpenAskSize,
-                CloseBidSize,
-                CloseAskSize,
-                FirstTradePrice,
-                LastTradePrice,
-                HighTradePrice,
-                LowTradePrice,
-                VolumeWeightPrice,
-                TradeToMidVolWeight
-            FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}' {date_filter}
-            ORDER BY Date, TimeBarStart
-        """
-        df = con.execute(query).df()
+        bars = load_microstructure(pool, symbol, date)
+    except Exception as e:
+        logger.exception("Error in get_accumulation_data")
+        return {"s": "error", "message": str(e)}
+    
+    if len(bars["t"]) == 0:
+        return no_data_response(cache_key)
+    
+    return stream_response(cache_key, {
+        "s": "ok",
+        "t": bars["t"],
+        "trade_at_bid": bars["TradeAtBid"],
+        "trade_at_bid_mid": bars["TradeAtBidMid"],
+        "trade_at_mid": bars["TradeAtMid"],
+        "trade_at_mid_ask": bars["TradeAtMidAsk"],
+        "trade_at_ask": bars["TradeAtAsk"],
+        "trade_at_cross": bars["TradeAtCrossOrLocked"],
+        "volume": bars["Volume"],
+        "total_trades": bars["TotalTrades"],
+        "uptick_volume": bars["UptickVolume"],
+        "downtick_volume": bars["DowntickVolume"],
+        "repeat_uptick": bars["RepeatUptickVolume"],
+        "repeat_downtick": bars["RepeatDowntickVolume"],
+        "open_bid_size": bars["OpenBidSize"],
+        "open_ask_size": bars["OpenAskSize"],
+        "close_bid_size": bars["CloseBidSize"],
+        "close_ask_size": bars["CloseAskSize"],
+        "first_price": bars["FirstTradePrice"],
+        "last_price": bars["LastTradePrice"],
+        "high_price": bars["HighTradePrice"],
+        "low_price": bars["LowTradePrice"],
+        "vwap": bars["VolumeWeightPrice"],
+        "trade_to_mid": bars["TradeToMidVolWeight"],
+        # Derived metrics
+        "buy_volume": bars["buy_volume"],
+        "sell_volume": bars["sell_volume"],
+        "delta": bars["delta"],
+        "cumulative_delta": bars["cumulative_delta"],
+    })
 
-        if df.empty:
-            return {"s": "no_data"}
 
-        df = df.ffill().fillna(0)
-        timestamps = []
-        for idx, row in df.iterrows():
-            time_val = row["TimeBarStart"]
-            date_val = row["Date"]
-            if hasattr(time_val, 'hour'):
-                hour, minute = time_val.hour, time_val.minute
-            else:
-                hour, minute = map(int, str(time_val).split(':')[:2])
-            year = date_val // 10000
-            month = (date_val % 10000) // 100
-            day = date_val % 100
-            dt = datetime(year, month, day, hour, minute)
-            timestamps.append(int(dt.timestamp()))
-
-        # Calculate derived metrics
-        # Buy Volume = TradeAtAsk + TradeAtMidAsk (aggressive + passive buying)
-        buy_volume = (df["TradeAtAsk"] + df["TradeAtMidAsk"]).tolist()
-        # Sell Volume = TradeAtBid + TradeAtBidMid (aggressive + passive selling)
-        sell_volume = (df["TradeAtBid"] + df["TradeAtBidMid"]).tolist()
-        # Delta = Buy - Sell (positive = buying pressure)
-        delta = (df["TradeAtAsk"] + df["TradeAtMidAsk"] - df["TradeAtBid"] - df["TradeAtBidMid"]).tolist()
-        # Cumulative Delta
-        cumulative_delta = (df["TradeAtAsk"] + df["TradeAtMidAsk"] - df["TradeAtBid"] - df["TradeAtBidMid"]).cumsum().tolist()
-        
-        return {
-            "s": "ok",
-            "t": timestamps,
-            "trade_at_bid": df["TradeAtBid"].tolist(),
-            "trade_at_bid_mid": df["TradeAtBidMid"].tolist(),
-            "trade_at_mid": df["TradeAtMid"].tolist(),
-            "trade_at_mid_ask": df["TradeAtMidAsk"].tolist(),
-            "trade_at_ask": df["TradeAtAsk"].tolist(),
-            "trade_at_cross": df["TradeAtCrossOrLocked"].tolist(),
-            "volume": df["Volume"].tolist(),
-            "total_trades": df["TotalTrades"].tolist(),
-            "uptick_volume": df["UptickVolume"].tolist(),
-            "downtick_volume": df["DowntickVolume"].tolist(),
-            "repeat_uptick": df["RepeatUptickVolume"].tolist(),
-            "repeat_downtick": df["RepeatDowntickVolume"].tolist(),
-            "open_bid_size": df["OpenBidSize"].tolist(),
-            "open_ask_size": df["OpenAskSize"].tolist(),
-            "close_bid_size": df["CloseBidSize"].tolist(),
-            "close_ask_size": df["CloseAskSize"].tolist(),
-            "first_price": df["FirstTradePrice"].tolist(),
-            "last_price": df["LastTradePrice"].tolist(),
-            "high_price": df["HighTradePrice"].tolist(),
-            "low_price": df["LowTradePrice"].tolist(),
-            "vwap": df["VolumeWeightPrice"].tolist(),
-            "trade_to_mid": df["TradeToMidVolWeight"].tolist(),
-            # Derived metrics
-            "buy_volume": buy_volume,
-            "sell_volume": sell_volume,
-            "delta": delta,
-            "cumulative_delta": cumulative_delta,
-        }
+@app.get("/api/accumulation")
+async def get_accumulation_data(request: Request, symbol: str, date: int = None):
+    """Get accumulation/distribution and buying pressure data"""
+    return await serve_cached(request, ("accumulation", symbol.upper(), date), build_accumulation_data, symbol, date)
+
+
+def build_delta_data(cache_key, symbol, date):
+    try:
+        pool = get_database_pool()
+        if not pool:
+            return {"s": "no_data"}
         
+        bars = load_microstructure(pool, symbol, date)
     except Exception as e:
-        print(f"Error in get_accumulation_data: {e}")
+        logger.exception("Error in get_delta_data")
         return {"s": "error", "message": str(e)}
+    
+    if len(bars["t"]) == 0:
+        return no_data_response(cache_key)
+    
+    return stream_response(cache_key, {
+        "s": "ok",
+        "t": bars["t"],
+        "delta": bars["delta"],
+        "cumulative_delta": bars["cumulative_delta"],
+        "tick_delta": bars["tick_delta"],
+        "cumulative_tick_delta": bars["cumulative_tick_delta"],
+        "book_imbalance": bars["book_imbalance"],
+        "delta_pct": bars["delta_pct"],
+        "buy_volume": bars["buy_volume"],
+        "sell_volume": bars["sell_volume"],
+        "uptick_volume": bars["uptick_total"],
+        "downtick_volume": bars["downtick_total"],
+        "volume": bars["Volume"],
+        "last_price": bars["LastTradePrice"],
+        "vwap": bars["VolumeWeightPrice"],
+        "trade_to_mid": bars["TradeToMidVolWeight"],
+    })
 
 
 @app.get("/api/delta")
-def get_delta_data(symbol: str, date: int = None):
+async def get_delta_data(request: Request, symbol: str, date: int = None):
     """Get delta and momentum data for directional analysis"""
-    try:
-        con = get_database_connection()
-        if not con:
-            return {"s": "no_data"}
-        
-        date_filter = f"AND Date = {date}" if date else ""
-        query = f"""
-            SELECT
-                TimeBarStart,
-                Date,
-                TradeAtBid,
-                TradeAtBidMid,
-                TradeAtMid,
-                TradeAtMidAsk,
-                TradeAtAsk,
-                Volume,
-                TotalTrades,
-                UptickVolume,
-                DowntickVolume,
-                RepeatUptickVolume,
-                RepeatDowntickVolume,
-                OpenBidSize,
-                OpenAskSize,
-                CloseBidSize,
-                CloseAskSize,
-                LastTradePrice,
-                VolumeWeightPrice,
-                TradeToMidVolWeight,
-                TradeToMidVolWeightRelative
-            FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}' {date_filter}
-            ORDER BY Date, TimeBarStart
-        """
-        df = con.execute(query).df()
+    return await serve_cached(request, ("delta", symbol.upper(), date), build_delta_data, symbol, date)
 
-        if df.empty:
-            return {"s": "no_data"}
 
-        df = df.ffill().fillna(0)
-        timestamps = []
-        for idx, row in df.iterrows():
-            time_val = row["TimeBarStart"]
-            date_val = row["Date"]
-            if hasattr(time_val, 'hour'):
-                hour, minute = time_val.hour, time_val.minute
-            else:
-                hour, minute = map(int, str(time_val).split(':')[:2])
-            year = date_val // 10000
-            month = (date_val % 10000) // 100
-            day = date_val % 100
-            dt = datetime(year, month, day, hour, minute)
-            timestamps.append(int(dt.timestamp()))
-
-        # Calculate Delta metrics
-        buy_vol = df["TradeAtAsk"] + df["TradeAtMidAsk"]
-        sell_vol = df["TradeAtBid"] + df["TradeAtBidMid"]
-        delta = buy_vol - sell_vol
-        cumulative_delta = delta.cumsum()
-        
-        # Tick Delta
-        uptick_total = df["UptickVolume"] + df["RepeatUptickVolume"]
-        downtick_total = df["DowntickVolume"] + df["RepeatDowntickVolume"]
-        tick_delta = uptick_total - downtick_total
-        cumulative_tick_delta = tick_delta.cumsum()
-        
-        # Order Book Imbalance
-        bid_size = (df["OpenBidSize"] + df["CloseBidSize"]) / 2
-        ask_size = (df["OpenAskSize"] + df["CloseAskSize"]) / 2
-        total_size = bid_size + ask_size
-        book_imbalance = ((bid_size - ask_size) / total_size.replace(0, 1) * 100)
-        
-        # Delta percentage (normalized)
-        total_vol = buy_vol + sell_vol
-        delta_pct = (delta / total_vol.replace(0, 1) * 100)
-        
-        return {
-            "s": "ok",
-            "t": timestamps,
-            "delta": delta.tolist(),
-            "cumulative_delta": cumulative_delta.tolist(),
-            "tick_delta": tick_delta.tolist(),
-            "cumulative_tick_delta": cumulative_tick_delta.tolist(),
-            "book_imbalance": book_imbalance.tolist(),
-            "delta_pct": delta_pct.tolist(),
-            "buy_volume": buy_vol.tolist(),
-            "sell_volume": sell_vol.tolist(),
-            "uptick_volume": uptick_total.tolist(),
-            "downtick_volume": downtick_total.tolist(),
-            "volume": df["Volume"].tolist(),
-            "last_price": df["LastTradePrice"].tolist(),
-            "vwap": df["VolumeWeightPrice"].tolist(),
-            "trade_to_mid": df["TradeToMidVolWeight"].tolist(),
-        }
-        
-    except Exception as e:
-        print(f"Error in get_delta_data: {e}")
-        return {"s": "error", "message": str(e)}
+SIGNAL_KEYS = (
+    "delta_score", "tick_score", "book_score", "mid_score",
+    "combined_signal", "cumulative_signal", "signal_strength", "momentum",
+)
 
+def signal_scores(bars):
+    """Score each bar from its order flow metrics (see SIGNAL_KEYS)
+    
+    The per-bar scores lie in [-100, 100] and are returned as float32 (half the
+    memory, and orjson writes them with ~8 significant digits instead of 17);
+    cumulative_signal stays float64 so long sessions do not drift."""
+    if NUMBA_AVAILABLE:
+        # Compiled single pass producing every score, without temporaries
+        return dict(zip(SIGNAL_KEYS, compute_signals(
+            bars["delta_pct"], bars["tick_delta"], bars["uptick_total"], bars["downtick_total"],
+            bars["book_imbalance"], bars["TradeToMidVolWeightRelative"],
+        )))
+    
+    total_tick = bars["uptick_total"] + bars["downtick_total"]
+    
+    # The input arrays are shared with the other order flow endpoints, so only
+    # arrays created here are clipped in place (out=)
+    
+    # === SIGNAL 1: Buy/Sell Delta Score (-100 to +100) ===
+    delta_score = np.clip(bars["delta_pct"], -100, 100)
+    
+    # === SIGNAL 2: Tick Delta Score (-100 to +100) ===
+    # Bars without ticks score 0 (their tick delta is 0 too)
+    tick_score = np.divide(bars["tick_delta"], total_tick, out=np.zeros(len(total_tick)), where=total_tick != 0)
+    np.multiply(tick_score, 100, out=tick_score)
+    np.clip(tick_score, -100, 100, out=tick_score)
+    
+    # === SIGNAL 3: Order Book Imbalance Score (-100 to +100) ===
+    book_score = np.clip(bars["book_imbalance"], -100, 100)
+    
+    # === SIGNAL 4: Trade-to-Mid Score (where trades happen relative to mid) ===
+    # Positive = trades closer to ask (buying), Negative = trades closer to bid (selling)
+    mid_score = bars["TradeToMidVolWeightRelative"] * 100
+    np.clip(mid_score, -100, 100, out=mid_score)
+    
+    # === COMBINED SIGNAL (weighted average) ===
+    # Weights: Delta 40%, Tick 25%, Book 20%, Mid 15%
+    combined_signal = (
+        delta_score * 0.40 +
+        tick_score * 0.25 +
+        book_score * 0.20 +
+        mid_score * 0.15
+    )
+    np.clip(combined_signal, -100, 100, out=combined_signal)
+    
+    # === CUMULATIVE SIGNAL (running score) ===
+    cumulative_signal = combined_signal.cumsum()
+    
+    # === SIGNAL STRENGTH (absolute value, 0-100) ===
+    signal_strength = np.abs(combined_signal)
+    
+    # === MOMENTUM (rate of change of cumulative signal) ===
+    # The step of the running sum is the bar's combined signal itself (0 on
+    # the first bar), so it is copied rather than differenced back out
+    combined_signal = combined_signal.astype(np.float32)
+    momentum = combined_signal.copy()
+    momentum[:1] = 0
+    
+    return {
+        "delta_score": delta_score.astype(np.float32),
+        "tick_score": tick_score.astype(np.float32),
+        "book_score": book_score.astype(np.float32),
+        "mid_score": mid_score.astype(np.float32),
+        "combined_signal": combined_signal,
+        "cumulative_signal": cumulative_signal,
+        "signal_strength": signal_strength.astype(np.float32),
+        "momentum": momentum,
+    }
 
-@app.get("/api/signal")
-def get_signal_data(symbol: str, date: int = None):
-    """Get combined signal score for price direction prediction"""
-    try:
-        con = get_database_connection()
-        if not con:
-            return {"s": "no_data"}
-        
-        date_filter = f"AND Date = {date}" if date else ""
-        query = f"""
-            SELECT
-                TimeBarStart,
-                Date,
-                TradeAtBid,
-                TradeAtBidMid,
-                TradeAtMid,
-                TradeAtMidAsk,
-                TradeAtAsk,
-                Volume,
-                UptickVolume,
-                DowntickVolume,
-                RepeatUptickVolume,
-                RepeatDowntickVolume,
-                OpenBidSize,
-                OpenAskSize,
-                CloseBidSize,
-                CloseAskSize,
-                LastTradePrice,
-                VolumeWeightPrice,
-                TradeToMidVolWeight,
-                TradeToMidVolWeightRelative,
-                MinSpread,
-                MaxSpread
-            FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}' {date_filter}
-            ORDER BY Date, TimeBarStart
-        """
-        df = con.execute(query).df()
 
-        if df.empty:
+def build_signal_data(cache_key, symbol, date):
+    try:
+        pool = get_database_pool()
+        if not pool:
             return {"s": "no_data"}
-
-        df = df.ffill().fillna(0)
-        timestamps = []
-        for idx, row in df.iterrows():
-            time_val = row["TimeBarStart"]
-            date_val = row["Date"]
-            if hasattr(time_val, 'hour'):
-                hour, minute = time_val.hour, time_val.minute
-            else:
-                hour, minute = map(int, str(time_val).split(':')[:2])
-            year = date_val // 10000
-            month = (date_val % 10000) // 100
-            day = date_val % 100
-            dt = datetime(year, month, day, hour, minute)
-            timestamps.append(int(dt.timestamp()))
-
-        # === SIGNAL 1: Buy/Sell Delta Score (-100 to +100) ===
-        buy_vol = df["TradeAtAsk"] + df["TradeAtMidAsk"]
-        sell_vol = df["TradeAtBid"] + df["TradeAtBidMid"]
-        total_vol = buy_vol + sell_vol
-        delta_score = ((buy_vol - sell_vol) / total_vol.replace(0, 1) * 100).clip(-100, 100)
-        
-        # === SIGNAL 2: Tick Delta Score (-100 to +100) ===
-        uptick = df["UptickVolume"] + df["RepeatUptickVolume"]
-        downtick = df["DowntickVolume"] + df["RepeatDowntickVolume"]
-        total_tick = uptick + downtick
-        tick_score = ((uptick - downtick) / total_tick.replace(0, 1) * 100).clip(-100, 100)
-        
-        # === SIGNAL 3: Order Book Imbalance Score (-100 to +100) ===
-        bid_size = (df["OpenBidSize"] + df["CloseBidSize"]) / 2
-        ask_size = (df["OpenAskSize"] + df["CloseAskSize"]) / 2
-        total_size = bid_size + ask_size
-        book_score = ((bid_size - ask_size) / total_size.replace(0, 1) * 100).clip(-100, 100)
-        
-        # === SIGNAL 4: Trade-to-Mid Score (where trades happen relative to mid) ===
-        # Positive = trades closer to ask (buying), Negative = trades closer to bid (selling)
-        mid_score = (df["TradeToMidVolWeightRelative"] * 100).clip(-100, 100)
-        
-        # === COMBINED SIGNAL (weighted average) ===
-        # Weights: Delta 40%, Tick 25%, Book 20%, Mid 15%
-        combined_signal = (
-            delta_score * 0.40 +
-            tick_score * 0.25 +
-            book_score * 0.20 +
-            mid_score * 0.15
-        ).clip(-100, 100)
-        
-        # === CUMULATIVE SIGNAL (running score) ===
-        cumulative_signal = combined_signal.cumsum()
-        
-        # === SIGNAL STRENGTH (absolute value, 0-100) ===
-        signal_strength = combined_signal.abs()
-        
-        # === MOMENTUM (rate of change of cumulative signal) ===
-        momentum = cumulative_signal.diff().fillna(0)
-        
-        return {
-            "s": "ok",
-            "t": timestamps,
-            # Individual signals
-            "delta_score": delta_score.tolist(),
-            "tick_score": tick_score.tolist(),
-            "book_score": book_score.tolist(),
-            "mid_score": mid_score.tolist(),
-            # Combined
-            "combined_signal": combined_signal.tolist(),
-            "cumulative_signal": cumulative_signal.tolist(),
-            "signal_strength": signal_strength.tolist(),
-            "momentum": momentum.tolist(),
-            # Price data
-            "last_price": df["LastTradePrice"].tolist(),
-            "vwap": df["VolumeWeightPrice"].tolist(),
-            "volume": df["Volume"].tolist(),
-            # Spread
-            "min_spread": df["MinSpread"].tolist(),
-            "max_spread": df["MaxSpread"].tolist(),
-        }
         
+        bars = load_microstructure(pool, symbol, date)
     except Exception as e:
-        print(f"Error in get_signal_data: {e}")
+        logger.exception("Error in get_signal_data")
         return {"s": "error", "message": str(e)}
+    
+    if len(bars["t"]) == 0:
+        return no_data_response(cache_key)
+    
+    signals = signal_scores(bars)
+    
+    return stream_response(cache_key, {
+        "s": "ok",
+        "t": bars["t"],
+        # Individual signals
+        "delta_score": signals["delta_score"],
+        "tick_score": signals["tick_score"],
+        "book_score": signals["book_score"],
+        "mid_score": signals["mid_score"],
+        # Combined
+        "combined_signal": signals["combined_signal"],
+        "cumulative_signal": signals["cumulative_signal"],
+        "signal_strength": signals["signal_strength"],
+        "momentum": signals["momentum"],
+        # Price data
+        "last_price": bars["LastTradePrice"],
+        "vwap": bars["VolumeWeightPrice"],
+        "volume": bars["Volume"],
+        # Spread
+        "min_spread": bars["MinSpread"],
+        "max_spread": bars["MaxSpread"],
+    })
+
+
+@app.get("/api/signal")
+async def get_signal_data(request: Request, symbol: str, date: int = None):
+    """Get combined signal score for price direction prediction"""
+    return await serve_cached(request, ("signal", symbol.upper(), date), build_signal_data, symbol, date)
 
 @app.get("/api/raw-data")
-def get_raw_data(symbol: str, date: int = None, limit: int = 100, offset: int = 0):
+async def get_raw_data(symbol: str, date: int = None, limit: int = 100, offset: int = 0):
     """Get raw data from taq_1min table"""
     try:
-        con = get_database_connection()
-        if not con:
+        pool = get_database_pool()
+        if not pool:
             return {"s": "no_data", "data": [], "total": 0}
         
-        date_filter = f"AND Date = {date}" if date else ""
+        params = bar_filter_params(symbol, date)
         
-        # Get total count
-        count_query = f"""
-            SELECT COUNT(*) FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}' {date_filter}
-        """
-        total = con.execute(count_query).fetchone()[0]
+        def fetch_total():
+            with pool.acquire() as con:
+                return con.execute(QUERIES["raw_count"], params).fetchone()[0]
         
-        # Get data
-        query = f"""
-            SELECT * FROM taq_1min
-            WHERE Ticker = '{symbol.upper()}' {date_filter}
-            ORDER BY Date, TimeBarStart
-            LIMIT {limit} OFFSET {offset}
-        """
-        df = con.execute(query).df()
-        con.close()
+        def fetch_page():
+            with pool.acquire() as con:
+                return con.execute(QUERIES["raw_page"], params + [limit, offset]).fetch_arrow_table()
         
-        if df.empty:
-            return {"s": "no_data", "data": [], "total": 0}
+        # Run the count and the page query concurrently, each on its own cursor
+        total, table = await asyncio.gather(asyncio.to_thread(fetch_total), asyncio.to_thread(fetch_page))
         
-        # Convert to records
-        records = df.to_dict('records')
+        if table.num_rows == 0:
+            return {"s": "no_data", "data": [], "total": 0}
         
-        # Convert time objects to strings for JSON serialization
-        import pandas as pd
-        for record in records:
-            for key, value in record.items():
-                if hasattr(value, 'isoformat'):
-                    record[key] = value.isoformat()
-                elif pd.isna(value):
-                    record[key] = None
+        # Records straight from Arrow: nulls become None, integer columns stay
+        # integers (orjson writes any NaN as null)
+        records = table.to_pylist()
         
         return {
             "s": "ok",
             "data": records,
             "total": total,
-            "columns": list(df.columns),
+            "columns": table.column_names,
             "limit": limit,
             "offset": offset
         }
         
     except Exception as e:
-        print(f"Error in get_raw_data: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_raw_data")
         return {"s": "error", "message": str(e), "data": [], "total": 0}
+
+
+# Endpoints whose default responses are precomputed for the PRELOAD_SYMBOLS tickers
+PRECOMPUTED_ENDPOINTS = {
+    "history": get_history,
+    "spread": get_spread_data,
+    "indicators": get_indicators,
+    "volume": get_volume_data,
+    "liquidity": get_liquidity_data,
+    "flow": get_flow_data,
+    "accumulation": get_accumulation_data,
+    "delta": get_delta_data,
+    "signal": get_signal_data,
+}
+
+@app.on_event("startup")
+async def precompute_responses():
+    """Run each data endpoint once per preloaded symbol and pin the encoded bytes
+    in PRECOMPUTED, so those requests are served straight from memory"""
+    # Registered after load_preloaded_symbols, so SYMBOL_BARS is already filled
+    request = Request({"type": "http", "method": "GET", "headers": [], "query_string": b""})
+    symbols = list(SYMBOL_BARS)
+    for symbol in symbols:
+        for endpoint, handler in PRECOMPUTED_ENDPOINTS.items():
+            key = (endpoint, symbol, None)
+            # Drop the previous payload so a refresh re-encodes it from the new bars
+            with response_cache_lock:
+                PRECOMPUTED.pop(key, None)
+                RESPONSE_CACHE.pop(key, None)
+            try:
+                response = await handler(request, symbol)
+                if isinstance(response, StreamingResponse):
+                    # The payload is cached once the stream has been consumed
+                    async for _ in response.body_iterator:
+                        pass
+            except Exception:
+                logger.exception("Error precomputing %s for %s", endpoint, symbol)
+                continue
+            with response_cache_lock:
+                entry = RESPONSE_CACHE.pop(key, None)
+                if entry is not None:
+                    PRECOMPUTED[key] = entry
+    if PRECOMPUTED:
+        logger.info(f"📦 Precomputed {len(PRECOMPUTED)} responses for {len(symbols)} symbols")
+
+async def refresh_preloaded_symbols():
+    """Reload the preloaded bars and re-encode their responses every
+    RESPONSE_CACHE_TTL seconds, so newly ingested bars reach them"""
+    while True:
+        await asyncio.sleep(RESPONSE_CACHE_TTL)
+        try:
+            await asyncio.to_thread(preload_symbol_bars)
+            await precompute_responses()
+        except Exception:
+            logger.exception("Error refreshing preloaded symbols")
+
+preload_refresh_task = None
+
+@app.on_event("startup")
+def start_preload_refresh():
+    global preload_refresh_task
+    if PRELOAD_SYMBOLS:
+        preload_refresh_task = asyncio.create_task(refresh_preloaded_symbols())
+
+@app.on_event("shutdown")
+def stop_preload_refresh():
+    if preload_refresh_task:
+        preload_refresh_task.cancel()
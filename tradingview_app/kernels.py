@@ -0,0 +1,67 @@
+"""
+Numba-compiled kernels for the API hot paths
+
+numba is optional: when it is not installed, NUMBA_AVAILABLE is False and
+app.py uses its vectorized numpy code paths instead.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    # nogil: the endpoints call kernels from worker threads, which can then
+    # run them on separate cores at the same time
+    @njit(cache=True, nogil=True)
+    def compute_signals(delta_pct, tick_delta, uptick_total, downtick_total, book_imbalance, mid_relative):
+        """Signal scores of /api/signal in one pass over the bars
+        
+        Returns (delta_score, tick_score, book_score, mid_score, combined_signal,
+        cumulative_signal, signal_strength, momentum), matching the numpy path.
+        Computed in float64; the per-bar scores are stored as float32, the
+        running cumulative_signal stays float64.
+        """
+        n = delta_pct.shape[0]
+        delta_score = np.empty(n, dtype=np.float32)
+        tick_score = np.empty(n, dtype=np.float32)
+        book_score = np.empty(n, dtype=np.float32)
+        mid_score = np.empty(n, dtype=np.float32)
+        combined_signal = np.empty(n, dtype=np.float32)
+        cumulative_signal = np.empty(n)
+        signal_strength = np.empty(n, dtype=np.float32)
+        momentum = np.empty(n, dtype=np.float32)
+        
+        cumulative = 0.0
+        for i in range(n):
+            delta = min(max(delta_pct[i], -100.0), 100.0)
+            tick_total = uptick_total[i] + downtick_total[i]
+            if tick_total == 0:
+                tick_total = 1
+            tick = min(max(tick_delta[i] / tick_total * 100, -100.0), 100.0)
+            book = min(max(book_imbalance[i], -100.0), 100.0)
+            mid = min(max(mid_relative[i] * 100, -100.0), 100.0)
+        
+            # Weights: Delta 40%, Tick 25%, Book 20%, Mid 15%
+            combined = min(max(delta * 0.40 + tick * 0.25 + book * 0.20 + mid * 0.15, -100.0), 100.0)
+        
+            cumulative += combined
+            delta_score[i] = delta
+            tick_score[i] = tick
+            book_score[i] = book
+            mid_score[i] = mid
+            combined_signal[i] = combined
+            cumulative_signal[i] = cumulative
+            signal_strength[i] = abs(combined)
+            # Step of the running sum: the combined signal (0 on the first bar)
+            momentum[i] = combined if i > 0 else 0.0
+        
+        return (delta_score, tick_score, book_score, mid_score, combined_signal,
+                cumulative_signal, signal_strength, momentum)
+    
+    # Compile (or load from numba's on-disk cache) at import instead of on the
+    # first /api/signal request; BIGINT tick columns arrive as int64
+    compute_signals(np.zeros(1), np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64), np.zeros(1), np.zeros(1))
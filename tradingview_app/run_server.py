@@ -5,4 +5,16 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
+    # Auto-reload only with DEV=1 (see start_server.py)
+    if os.getenv("DEV", "0") == "1":
+        uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
+    else:
+        uvicorn.run(
+            "app:app",
+            host="127.0.0.1",
+            port=8000,
+            workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+            loop="uvloop",
+            http="httptools",
+            log_level="warning"
+        )
\ No newline at end of file
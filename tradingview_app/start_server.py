@@ -10,4 +10,18 @@ sys.path.insert(0, current_dir)
 if __name__ == "__main__":
     os.chdir(current_dir)
     print(f"✅ Starting server from: {current_dir}")
-    uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
+    # Auto-reload (a file watcher process, single worker) only with DEV=1;
+    # otherwise uvloop/httptools (uvicorn[standard]) with WEB_CONCURRENCY
+    # worker processes (default 1, as in start.py)
+    if os.getenv("DEV", "0") == "1":
+        uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
+    else:
+        uvicorn.run(
+            "app:app",
+            host="127.0.0.1",
+            port=8000,
+            workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+            loop="uvloop",
+            http="httptools",
+            log_level="warning"
+        )
\ No newline at end of file